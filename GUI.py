@@ -1,11 +1,26 @@
 import sys
-import json
 import copy
+import time
+from functools import partial
 import numpy as np
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg
 from matplotlib.backends.backend_qt import NavigationToolbar2QT as NavigationToolbar
-from main import material_list, reflectance, Material
+from main import (
+    material_library,
+    cached_reflectance_map,
+    cached_reflectance_sp,
+    memoized,
+    result_cache,
+    Material,
+    IncrementalStack,
+    adaptive_grid,
+    perturbed_reflectance,
+    instrumentation,
+)
+from averaging import averaged_reflectance, averaged_reflectance_sp, cone_half_angle
+from optimizer import global_search, refine
+from tolerance import DISTRIBUTIONS, ToleranceResult, sample_errors
 from PyQt6.QtWidgets import (
     QApplication,
     QComboBox,
@@ -21,9 +36,302 @@ from PyQt6.QtWidgets import (
     QDialog,
     QLabel,
     QPlainTextEdit,
+    QProgressBar,
+    QFileDialog,
+    QCheckBox,
 )
+from PyQt6.QtCore import QThread, pyqtSignal
 from PyQt6.QtGui import QIcon
 
+BOTH_POLARIZATIONS = "Beide/Unpolarisiert"
+PROGRESS_STEPS = 20
+OPTIMIZATION_POINTS = 400
+
+
+def compute_curves(material_list, polarization, wavelengths, angles):
+    """Berechnet die Reflexionskurven für die im GUI gewählte Polarisation.
+
+    Beide Polarisationen werden gemeinsam berechnet und im result_cache abgelegt,
+    sodass ein Wechsel der Polarisation oder ein erneutes Zeichnen nichts neu rechnet.
+
+    Args:
+        material_list (list): Liste von Material-Objekten.
+        polarization (str): "Senkrecht", "Parallel" oder BOTH_POLARIZATIONS.
+        wavelengths (list | float): Wellenlängen in Meter.
+        angles (list | float): Einfallswinkel in Radiant.
+
+    Returns:
+        Dictionary von Polarisation zu Reflexionsgraden.
+    """
+    reflect_s, reflect_p = cached_reflectance_sp(material_list, wavelengths, angles)
+    return select_curves(polarization, reflect_s, reflect_p)
+
+
+def select_curves(polarization, reflect_s, reflect_p):
+    """Wählt aus s- und p-Reflexionsgrad die Kurven der im GUI gewählten Polarisation.
+
+    Args:
+        polarization (str): "Senkrecht", "Parallel" oder BOTH_POLARIZATIONS.
+        reflect_s (np.ndarray): Reflexionsgrad für senkrechte Polarisation.
+        reflect_p (np.ndarray): Reflexionsgrad für parallele Polarisation.
+
+    Returns:
+        Dictionary von Polarisation zu Reflexionsgraden.
+    """
+    curves = {"Senkrecht": reflect_s, "Parallel": reflect_p}
+    if polarization != BOTH_POLARIZATIONS:
+        return {polarization: curves[polarization]}
+    curves["Unpolarisiert"] = (reflect_s + reflect_p) / 2
+    return curves
+
+
+def averaged_curves(material_list, polarization, wavelengths, angles, options):
+    """Wie compute_curves, aber über Bandbreite und Strahlkegel gemittelt.
+
+    Args:
+        material_list (list): Liste von Material-Objekten.
+        polarization (str): "Senkrecht", "Parallel" oder BOTH_POLARIZATIONS.
+        wavelengths (list | float): Wellenlängen in Meter.
+        angles (list | float): Einfallswinkel des Hauptstrahls in Radiant.
+        options (dict): Argumente für averaged_reflectance (bandwidth, cone).
+
+    Returns:
+        Dictionary von Polarisation zu gemittelten Reflexionsgraden.
+    """
+    reflect_s, reflect_p = memoized(
+        ("R_sp", tuple(sorted(options.items()))),
+        material_list,
+        wavelengths,
+        None,
+        angles,
+        lambda: averaged_reflectance_sp(material_list, wavelengths, angles, **options),
+    )
+    return select_curves(polarization, reflect_s, reflect_p)
+
+
+def averaged_map(material_list, wavelengths, polarization, angles, options):
+    """Wie cached_reflectance_map, aber über Bandbreite und Strahlkegel gemittelt."""
+    return memoized(
+        ("R_map", tuple(sorted(options.items()))),
+        material_list,
+        wavelengths,
+        polarization,
+        angles,
+        lambda: averaged_reflectance(
+            material_list,
+            np.asarray(wavelengths)[:, np.newaxis],
+            polarization,
+            np.asarray(angles)[np.newaxis, :],
+            **options,
+        ),
+    )
+
+
+def merge_curves(results):
+    """Fügt die Teilergebnisse von compute_curves in Rasterreihenfolge zusammen.
+
+    Args:
+        results (list): Liste von Dictionaries aus compute_curves.
+
+    Returns:
+        Dictionary von Polarisation zu vollständigen Reflexionsgraden.
+    """
+    return {
+        polarization: np.concatenate([result[polarization] for result in results])
+        for polarization in results[0]
+    }
+
+
+def incremental_curves(states, key, material_list, polarization, wavelengths, angles):
+    """Wie compute_curves, hält aber pro Teilraster die Teilprodukte der Transfermatrix vor.
+
+    Ändert der Benutzer zwischen zwei Läufen nur einzelne Schichten, werden nur diese
+    neu eingerechnet. Beide Polarisationen werden immer gemeinsam gehalten, damit
+    ein Wechsel der Polarisation keinen Neuaufbau auslöst. Bereits berechnete Systeme
+    kommen aus dem result_cache, Systeme mit inkohärenten Schichten werden wie bei
+    compute_curves vollständig berechnet.
+
+    Args:
+        states (dict): Zwischenspeicher der IncrementalStack-Objekte.
+        key (hashable): Schlüssel des Teilrasters in states.
+        material_list (list): Liste von Material-Objekten.
+        polarization (str): "Senkrecht", "Parallel" oder BOTH_POLARIZATIONS.
+        wavelengths (list | float): Wellenlängen in Meter.
+        angles (list | float): Einfallswinkel in Radiant.
+
+    Returns:
+        Dictionary von Polarisation zu Reflexionsgraden.
+    """
+    if any(m.incoherent for m in material_list[1:-1]):
+        states.pop(key, None)
+        return compute_curves(material_list, polarization, wavelengths, angles)
+
+    def compute():
+        state = states.get(key)
+        if state is None:
+            state = states.setdefault(
+                key,
+                IncrementalStack(material_list, wavelengths, "Unpolarisiert", angles),
+            )
+        # Abgleich und Ergebnis unter einer Sperre, da ein abgebrochener Lauf
+        # denselben Zustand noch verwenden kann
+        result_s, result_p = state.evaluate(material_list, wavelengths, angles)
+        return result_s.R, result_p.R
+
+    # Gleicher Schlüssel wie cached_reflectance_sp in doppelter Genauigkeit
+    reflect_s, reflect_p = memoized(
+        ("R_sp", "double"), material_list, wavelengths, None, angles, compute
+    )
+    return select_curves(polarization, reflect_s, reflect_p)
+
+
+def adaptive_curves(
+    material_list,
+    polarization,
+    wavelengths,
+    angles,
+    tolerance,
+    max_points,
+    compute=compute_curves,
+    stop=None,
+):
+    """Berechnet die Kurven von compute_curves auf einem adaptiv verfeinerten Raster.
+
+    Genau einer der Parameter wavelengths und angles ist ein Bereich (Start, Ende);
+    verfeinert wird, bis alle Kurven die Toleranz einhalten.
+
+    Args:
+        material_list (list): Liste von Material-Objekten.
+        polarization (str): "Senkrecht", "Parallel" oder BOTH_POLARIZATIONS.
+        wavelengths (float | tuple): Wellenlänge oder Bereich in Meter.
+        angles (float | tuple): Einfallswinkel oder Bereich in Radiant.
+        tolerance (float): Erlaubter Fehler von R bei linearer Interpolation.
+        max_points (int): Höchstzahl an Stützstellen.
+        compute (callable): Berechnung der Kurven mit der Signatur von compute_curves.
+        stop (callable): Liefert True, wenn die Verfeinerung abgebrochen werden soll.
+
+    Returns:
+        Tupel aus Stützstellen und Dictionary von Polarisation zu Reflexionsgraden.
+    """
+    sweep_wavelength = np.size(wavelengths) == 2
+    names = []
+
+    def evaluate(x):
+        curves = (
+            compute(material_list, polarization, x, angles)
+            if sweep_wavelength
+            else compute(material_list, polarization, wavelengths, x)
+        )
+        names[:] = curves
+        return np.array(list(curves.values()))
+
+    x, values = adaptive_grid(
+        evaluate,
+        *(wavelengths if sweep_wavelength else angles),
+        tolerance,
+        max_points,
+        cancelled=stop,
+    )
+    return x, dict(zip(names, values))
+
+
+def calculation_cancelled():
+    """Prüft, ob der CalculationThread, in dem der Aufruf läuft, abgebrochen wurde.
+
+    Lange Teilaufgaben erhalten diese Funktion als stop-Parameter, damit ein Abbruch
+    oder ein neuer Lauf nicht erst am Ende der Teilaufgabe wirkt.
+    """
+    thread = QThread.currentThread()
+    return isinstance(thread, CalculationThread) and thread.cancelled
+
+
+class CalculationThread(QThread):
+    """Führt eine in Teilaufgaben zerlegte Berechnung außerhalb der Ereignisschleife aus.
+
+    Zwischen den Teilaufgaben wird der Fortschritt gemeldet und auf einen Abbruch
+    geprüft, lange Teilaufgaben prüfen zusätzlich calculation_cancelled; das Ergebnis
+    wird per Signal an das Hauptfenster geliefert.
+    """
+
+    progress = pyqtSignal(int, int)
+    result = pyqtSignal(int, object)
+    error = pyqtSignal(int, object)
+
+    def __init__(self, job_id: int, tasks: list):
+        super().__init__()
+        self.job_id = job_id
+        self.tasks = tasks
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        results = []
+        try:
+            for i, task in enumerate(self.tasks):
+                if self.cancelled:
+                    return
+                results.append(task())
+                self.progress.emit(self.job_id, i + 1)
+        except Exception as e:
+            self.error.emit(self.job_id, e)
+            return
+        if not self.cancelled:
+            self.result.emit(self.job_id, results)
+
+
+class OptimizationThread(QThread):
+    """Führt eine Dickenoptimierung aus und meldet nach jedem Schritt die Gütefunktion.
+
+    Der Mehrfachstart nutzt einen Thread-Pool, da GUI.py beim Import das Fenster
+    startet und daher nicht in neuen Prozessen geladen werden kann.
+    """
+
+    progress = pyqtSignal(int, int)
+    merit = pyqtSignal(int, float)
+    result = pyqtSignal(int, object)
+    error = pyqtSignal(int, object)
+
+    def __init__(self, job_id: int, material_list: list, starts: int, options: dict):
+        super().__init__()
+        self.job_id = job_id
+        self.material_list = material_list
+        self.starts = starts
+        self.options = options
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def report(self, step, merit):
+        self.progress.emit(self.job_id, step)
+        self.merit.emit(self.job_id, merit)
+
+    def run(self):
+        try:
+            if self.starts > 1:
+                result = global_search(
+                    self.material_list,
+                    starts=self.starts,
+                    pool="thread",
+                    progress=self.report,
+                    stop=lambda: self.cancelled,
+                    **self.options,
+                )
+            else:
+                result = refine(
+                    self.material_list,
+                    progress=self.report,
+                    stop=lambda: self.cancelled,
+                    **self.options,
+                )
+        except Exception as e:
+            self.error.emit(self.job_id, e)
+            return
+        if not self.cancelled:
+            self.result.emit(self.job_id, result)
+
 
 class MainWindow(QMainWindow):
     def __init__(
@@ -61,8 +369,10 @@ class MainWindow(QMainWindow):
 
     def setup_table(self):
         self.grid = QTableWidget()
-        self.grid.setColumnCount(3)
-        self.grid.setHorizontalHeaderLabels(["Material", "Dicke in nm", ""])
+        self.grid.setColumnCount(4)
+        self.grid.setHorizontalHeaderLabels(
+            ["Material", "Dicke in nm", "", "Inkohärent"]
+        )
         self.grid.horizontalHeader().setSectionResizeMode(  # type: ignore
             QHeaderView.ResizeMode.Stretch
         )
@@ -76,6 +386,7 @@ class MainWindow(QMainWindow):
         self.canvas.axes.set_xlabel("Wellenlänge [nm]")
         self.canvas.axes.set_ylabel("Reflexionsgrad R")
         self.canvas.axes.grid(True)
+        self.colorbar = None
 
     def setup_fields(self):
         self.new_material = QPushButton("Neues Material anlegen")
@@ -87,11 +398,47 @@ class MainWindow(QMainWindow):
         self.polarization = QComboBox()
         self.polarization.addItem("Senkrecht")
         self.polarization.addItem("Parallel")
+        self.polarization.addItem(BOTH_POLARIZATIONS)
+        self.adaptive = QCheckBox("Adaptiv")
+        self.adaptive.setChecked(True)
+        self.adaptive.setToolTip(
+            "Raster nur dort verdichten, wo das Spektrum stark gekrümmt ist"
+        )
+        self.tolerance = QLineEdit()
+        self.tolerance.setPlaceholderText("Toleranz (0.001)")
+        self.max_points = QLineEdit()
+        self.max_points.setPlaceholderText("Max. Punkte (2000)")
+        self.adaptive.toggled.connect(self.tolerance.setEnabled)
+        self.adaptive.toggled.connect(self.max_points.setEnabled)
+        self.bandwidth = QLineEdit()
+        self.bandwidth.setPlaceholderText("Bandbreite (nm)")
+        self.bandwidth.setToolTip("Über ein Wellenlängenfenster dieser Breite mitteln")
+        self.f_number = QLineEdit()
+        self.f_number.setPlaceholderText("Blendenzahl")
+        self.f_number.setToolTip("Über den Strahlkegel dieser Blendenzahl mitteln")
+        self.profile = QCheckBox("Laufzeiten")
+        self.profile.setToolTip(
+            "Rechenzeit pro Abschnitt nach jeder Berechnung in der Statusleiste anzeigen"
+        )
+        self.profile.toggled.connect(self.toggle_profiling)
+        self.cache_label = QLabel()
         self.run_button = QPushButton("Bestätigen")
         self.run_button.clicked.connect(self.plot_function)
+        self.optimize_button = QPushButton("Optimieren")
+        self.optimize_button.clicked.connect(self.optimize)
+        self.tolerance_button = QPushButton("Toleranzanalyse")
+        self.tolerance_button.clicked.connect(self.analyze_tolerances)
         self.toolbar = NavigationToolbar(self.canvas, self)
         self.reset_button = QPushButton("Zurücksetzen")
         self.reset_button.clicked.connect(self.reset)
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setVisible(False)
+        self.cancel_button = QPushButton("Abbrechen")
+        self.cancel_button.setVisible(False)
+        self.cancel_button.clicked.connect(self.cancel_calculation)
+        self.threads = []
+        self.job_id = 0
+        self.sweep_states = {}
 
     def setup_layout(self):
         gridmat_layout = QVBoxLayout()
@@ -112,72 +459,482 @@ class MainWindow(QMainWindow):
         layout_h.addWidget(self.wavelength)
         layout_h.addWidget(self.angle)
         layout_h.addWidget(self.polarization)
+        layout_h.addWidget(self.adaptive)
+        layout_h.addWidget(self.tolerance)
+        layout_h.addWidget(self.max_points)
+        layout_h.addWidget(self.bandwidth)
+        layout_h.addWidget(self.f_number)
+        layout_h.addWidget(self.profile)
         layout_h.addWidget(self.run_button)
+        layout_h.addWidget(self.optimize_button)
+        layout_h.addWidget(self.tolerance_button)
+        layout_h.addWidget(self.progress_bar)
+        layout_h.addWidget(self.cancel_button)
         layout_v.addLayout(layout_h)
         self.central_widget.setLayout(layout_v)
+        self.statusBar().addPermanentWidget(self.cache_label)
+        self.update_cache_label()
+        if material_library.errors:
+            self.statusBar().showMessage(
+                "Fehlerhafte Materialien übersprungen: "
+                + ", ".join(material_library.errors)
+            )
+            self.statusBar().setToolTip(
+                "\n".join(f"{k}: {v}" for k, v in material_library.errors.items())
+            )
 
     def plot_function(self):
         try:
             self.validate_inputs()
-            if len(self.wavelengths) > 1:
+            materials = self.new_material_list
+            polarization = self.polarization.currentText()
+            averaging = self.averaging_options()
+            compute = (
+                compute_curves
+                if averaging is None
+                else partial(averaged_curves, options=averaging)
+            )
+
+            def sweep_task(key, wavelengths, angles):
+                # Gemittelte Kurven werden nicht inkrementell nachgeführt
+                if averaging is not None:
+                    return partial(
+                        compute, materials, polarization, wavelengths, angles
+                    )
+                return partial(
+                    incremental_curves,
+                    self.sweep_states,
+                    key,
+                    materials,
+                    polarization,
+                    wavelengths,
+                    angles,
+                )
+
+            if len(self.wavelengths) > 1 and len(self.angles) > 1:
+                wavelength_lists = np.linspace(
+                    float(self.wavelengths[0]) * 1e-9,
+                    float(self.wavelengths[1]) * 1e-9,
+                    200,
+                )
+                angles_deg = np.linspace(
+                    float(self.angles[0]), float(self.angles[1]), 90
+                )
+                if polarization == BOTH_POLARIZATIONS:
+                    polarization = "Unpolarisiert"
+                label = [i.name for i in materials]
+                label.append(polarization)
+                label.extend(self.averaging_label())
+                map_function = (
+                    cached_reflectance_map
+                    if averaging is None
+                    else partial(averaged_map, options=averaging)
+                )
+                tasks = [
+                    partial(
+                        map_function,
+                        materials,
+                        chunk,
+                        polarization,
+                        angles_deg * np.pi / 180,
+                    )
+                    for chunk in np.array_split(wavelength_lists, PROGRESS_STEPS)
+                ]
+                self.start_calculation(
+                    tasks,
+                    lambda results: self.plot_map(
+                        wavelength_lists, angles_deg, np.concatenate(results), label
+                    ),
+                )
+            elif self.adaptive.isChecked() and (
+                len(self.wavelengths) > 1 or len(self.angles) > 1
+            ):
+                tolerance = float(self.tolerance.text() or 1e-3)
+                max_points = int(self.max_points.text() or 2000)
+                if tolerance <= 0 or max_points < 2:
+                    raise ValueError(
+                        "Toleranz muss größer als 0 und Max. Punkte mindestens 2 sein."
+                    )
+                label = [i.name for i in materials]
+                if len(self.wavelengths) > 1:
+                    wavelengths = tuple(float(w) * 1e-9 for w in self.wavelengths)
+                    angles = float(self.angles[0]) * (np.pi / 180)
+                    label.append(self.angle.text() + "\u00b0")
+                    scale, xlabel, ylabel = 1e9, "Wellenlänge [nm]", "Reflexionsgrad R"
+                else:
+                    wavelengths = float(self.wavelengths[0]) * 1e-9
+                    angles = tuple(float(a) * np.pi / 180 for a in self.angles)
+                    label.append(self.wavelengths[0] + "nm")
+                    scale, xlabel, ylabel = (
+                        180 / np.pi,
+                        "Einfallswinkel (\u03c6)",
+                        "Reflexion R",
+                    )
+                label.extend(self.averaging_label())
+                tasks = [
+                    partial(
+                        adaptive_curves,
+                        materials,
+                        polarization,
+                        wavelengths,
+                        angles,
+                        tolerance,
+                        max_points,
+                        compute,
+                        stop=calculation_cancelled,
+                    )
+                ]
+                self.start_calculation(
+                    tasks,
+                    lambda results: self.plot_curves(
+                        results[0][0] * scale, results[0][1], label, xlabel, ylabel
+                    ),
+                )
+            elif len(self.wavelengths) > 1:
                 wavelength_lists = np.linspace(
                     float(self.wavelengths[0]) * 1e-9,
                     float(self.wavelengths[1]) * 1e-9,
                     400,
                 )
-                label = [i.name for i in self.new_material_list]
+                label = [i.name for i in materials]
                 label.append(self.angle.text() + "\u00b0")
-                label.append(self.polarization.currentText())
-                reflect_list = reflectance(
-                    self.new_material_list,
-                    wavelength_lists,
-                    self.polarization.currentText(),
-                    float(self.angles[0]) * (np.pi / 180),
-                )
-                self.canvas.axes.set_xlabel("Wellenlänge [nm]")
-                self.canvas.axes.set_ylabel("Reflexionsgrad R")
-                self.canvas.axes.plot(
-                    wavelength_lists * 1e9, reflect_list, label=str(label)
+                label.extend(self.averaging_label())
+                tasks = [
+                    sweep_task(
+                        ("wavelength", i), chunk, float(self.angles[0]) * (np.pi / 180)
+                    )
+                    for i, chunk in enumerate(
+                        np.array_split(wavelength_lists, PROGRESS_STEPS)
+                    )
+                ]
+                self.start_calculation(
+                    tasks,
+                    lambda results: self.plot_curves(
+                        wavelength_lists * 1e9,
+                        merge_curves(results),
+                        label,
+                        "Wellenlänge [nm]",
+                        "Reflexionsgrad R",
+                    ),
                 )
-                self.canvas.axes.legend()
             elif len(self.angles) > 1:
-                label = [i.name for i in self.new_material_list]
-                label.append(self.wavelengths[0] + "nm")
-                label.append(self.polarization.currentText())
                 angles_rad = (
                     np.linspace(float(self.angles[0]), float(self.angles[1]), 100)
                     * np.pi
                     / 180
                 )
-                reflect_list = reflectance(
-                    self.new_material_list,
-                    float(self.wavelengths[0]) * 1e-9,
-                    self.polarization.currentText(),
-                    angles_rad,
-                )
-                self.canvas.axes.set_xlabel("Einfallswinkel (\u03c6)")
-                self.canvas.axes.set_ylabel("Reflexion R")
-                self.canvas.axes.plot(
-                    angles_rad * 180 / np.pi, reflect_list, label=str(label)
+                label = [i.name for i in materials]
+                label.append(self.wavelengths[0] + "nm")
+                label.extend(self.averaging_label())
+                tasks = [
+                    sweep_task(("angle", i), float(self.wavelengths[0]) * 1e-9, chunk)
+                    for i, chunk in enumerate(
+                        np.array_split(angles_rad, PROGRESS_STEPS)
+                    )
+                ]
+                self.start_calculation(
+                    tasks,
+                    lambda results: self.plot_curves(
+                        angles_rad * 180 / np.pi,
+                        merge_curves(results),
+                        label,
+                        "Einfallswinkel (\u03c6)",
+                        "Reflexion R",
+                    ),
                 )
-                self.canvas.axes.legend()
             else:
                 wavelength_lists = np.array([float(self.wavelengths[0]) * 1e-9])
                 angle_rad = float(self.angles[0]) * (np.pi / 180)
-                reflect_list = reflectance(
-                    self.new_material_list,
-                    wavelength_lists,
-                    self.polarization.currentText(),
-                    angle_rad,
+                tasks = [
+                    partial(
+                        compute,
+                        materials,
+                        polarization,
+                        wavelength_lists,
+                        angle_rad,
+                    )
+                ]
+                self.start_calculation(tasks, self.show_result)
+        except (ValueError, ZeroDivisionError, ArithmeticError) as e:
+            QMessageBox.warning(
+                self, "Fehlermeldung", f"Ungültige Auswahl oder Berechnungsfehler: {e}"
+            )
+        except Exception as e:
+            QMessageBox.critical(
+                self,
+                "Kritischer Fehler",
+                f"Ein unerwarteter Fehler ist aufgetreten: {e}",
+            )
+
+    def averaging_options(self):
+        """Liest Bandbreite und Blendenzahl, None ohne Mittelung."""
+        options = {}
+        if self.bandwidth.text().strip():
+            bandwidth = float(self.bandwidth.text())
+            if bandwidth < 0:
+                raise ValueError("Bandbreite darf nicht negativ sein.")
+            options["bandwidth"] = bandwidth * 1e-9
+        if self.f_number.text().strip():
+            options["cone"] = cone_half_angle(float(self.f_number.text()))
+        return options or None
+
+    def averaging_label(self):
+        label = []
+        if self.bandwidth.text().strip():
+            label.append(f"\u0394\u03bb {self.bandwidth.text().strip()} nm")
+        if self.f_number.text().strip():
+            label.append(f"f/{self.f_number.text().strip()}")
+        return label
+
+    def start_calculation(self, tasks, on_result):
+        # Ein neuer Lauf ersetzt alle noch laufenden, deren Ergebnisse verworfen werden
+        for thread in self.threads:
+            thread.cancel()
+        self.job_id += 1
+        thread = CalculationThread(self.job_id, tasks)
+        thread.progress.connect(self.update_progress)
+        thread.result.connect(
+            lambda job_id, results: self.finish_calculation(job_id, results, on_result)
+        )
+        thread.error.connect(self.calculation_failed)
+        thread.finished.connect(lambda: self.threads.remove(thread))
+        self.threads.append(thread)
+        instrumentation.reset()
+        self.started = time.perf_counter()
+        # Einzelne Aufgaben ohne Zwischenstände als Aktivitätsanzeige
+        self.progress_bar.setMaximum(len(tasks) if len(tasks) > 1 else 0)
+        self.progress_bar.setValue(0)
+        self.progress_bar.setVisible(True)
+        self.cancel_button.setVisible(True)
+        thread.start()
+
+    def optimize(self):
+        try:
+            self.validate_inputs()
+            if len(self.wavelengths) != 2:
+                raise ValueError(
+                    "Für die Optimierung wird ein Wellenlängenbereich benötigt."
                 )
-                QMessageBox.information(
-                    self, "Ergebnis", f"Reflexionsgrad R: {reflect_list[0]:.4f}"
+            if len(self.angles) > 1:
+                raise ValueError(
+                    "Für die Optimierung ist nur ein Einfallswinkel möglich."
                 )
-            self.canvas.draw()
-        except (ValueError, ZeroDivisionError, ArithmeticError) as e:
+            if len(self.new_material_list) < 3:
+                raise ValueError("Das Schichtsystem enthält keine Schichten.")
+            dialog = OptimizationDialog(self)
+            if not dialog.exec():
+                return
+            settings = dialog.settings
+            wavelengths = np.linspace(
+                float(self.wavelengths[0]) * 1e-9,
+                float(self.wavelengths[1]) * 1e-9,
+                OPTIMIZATION_POINTS,
+            )
+            if settings["target_file"]:
+                data = np.atleast_2d(
+                    np.loadtxt(settings["target_file"], delimiter=",", ndmin=2)
+                )
+                target = np.interp(wavelengths * 1e9, data[:, 0], data[:, 1])
+                weights = (
+                    np.interp(wavelengths * 1e9, data[:, 0], data[:, 2])
+                    if data.shape[1] > 2
+                    else 1.0
+                )
+            else:
+                target, weights = settings["target"], 1.0
+            polarization = self.polarization.currentText()
+            if polarization == BOTH_POLARIZATIONS:
+                polarization = "Unpolarisiert"
+            options = dict(
+                wavelengths=wavelengths,
+                target=target,
+                quantity=settings["quantity"],
+                polarization=polarization,
+                theta=float(self.angles[0]) * np.pi / 180,
+                weights=weights,
+                tolerances=settings["tolerance"],
+                min_thickness=settings["min_thickness"],
+                max_iterations=settings["iterations"],
+            )
+        except (ValueError, OSError, IndexError) as e:
             QMessageBox.warning(
                 self, "Fehlermeldung", f"Ungültige Auswahl oder Berechnungsfehler: {e}"
             )
+            return
+
+        for thread in self.threads:
+            thread.cancel()
+        self.job_id += 1
+        thread = OptimizationThread(
+            self.job_id, self.new_material_list, settings["starts"], options
+        )
+        thread.progress.connect(self.update_progress)
+        thread.merit.connect(self.update_merit)
+        thread.result.connect(self.finish_optimization)
+        thread.error.connect(self.calculation_failed)
+        thread.finished.connect(lambda: self.threads.remove(thread))
+        self.threads.append(thread)
+        self.progress_bar.setMaximum(
+            settings["starts"] if settings["starts"] > 1 else settings["iterations"]
+        )
+        self.progress_bar.setValue(0)
+        self.progress_bar.setVisible(True)
+        self.cancel_button.setVisible(True)
+        thread.start()
+
+    def analyze_tolerances(self):
+        try:
+            self.validate_inputs()
+            if (len(self.wavelengths) > 1) == (len(self.angles) > 1):
+                raise ValueError(
+                    "Für die Toleranzanalyse wird genau ein Bereich (Wellenlänge oder Winkel) benötigt."
+                )
+            if len(self.new_material_list) < 3:
+                raise ValueError("Das Schichtsystem enthält keine Schichten.")
+            dialog = ToleranceDialog(self)
+            if not dialog.exec():
+                return
+            settings = dialog.settings
+            materials = self.new_material_list
+            polarization = self.polarization.currentText()
+            if polarization == BOTH_POLARIZATIONS:
+                polarization = "Unpolarisiert"
+            label = [i.name for i in materials]
+            if len(self.wavelengths) > 1:
+                x_values = np.linspace(
+                    float(self.wavelengths[0]) * 1e-9,
+                    float(self.wavelengths[1]) * 1e-9,
+                    400,
+                )
+                wavelengths, angles = x_values, float(self.angles[0]) * np.pi / 180
+                label.append(self.angle.text() + "\u00b0")
+                scale, xlabel, ylabel = 1e9, "Wellenlänge [nm]", "Reflexionsgrad R"
+            else:
+                x_values = (
+                    np.linspace(float(self.angles[0]), float(self.angles[1]), 100)
+                    * np.pi
+                    / 180
+                )
+                wavelengths, angles = float(self.wavelengths[0]) * 1e-9, x_values
+                label.append(self.wavelengths[0] + "nm")
+                scale, xlabel, ylabel = (
+                    180 / np.pi,
+                    "Einfallswinkel (\u03c6)",
+                    "Reflexion R",
+                )
+            thickness_errors, index_errors = sample_errors(
+                materials,
+                settings["samples"],
+                settings["thickness_error"],
+                settings["index_error"],
+                settings["distribution"],
+            )
+        except ValueError as e:
+            QMessageBox.warning(
+                self, "Fehlermeldung", f"Ungültige Auswahl oder Berechnungsfehler: {e}"
+            )
+            return
+        steps = min(PROGRESS_STEPS, settings["samples"])
+        tasks = [
+            partial(
+                perturbed_reflectance,
+                materials,
+                wavelengths,
+                polarization,
+                angles,
+                thickness_chunk,
+                index_chunk,
+            )
+            for thickness_chunk, index_chunk in zip(
+                np.array_split(thickness_errors, steps),
+                np.array_split(index_errors, steps),
+            )
+        ]
+
+        def show(results):
+            nominal = perturbed_reflectance(
+                materials, wavelengths, polarization, angles, 0.0, 0.0
+            )[0]
+            self.plot_tolerance(
+                x_values * scale,
+                ToleranceResult(nominal, np.concatenate(results)),
+                label + [polarization],
+                xlabel,
+                ylabel,
+            )
+
+        self.start_calculation(tasks, show)
+
+    def plot_tolerance(self, x_values, result, label, xlabel, ylabel):
+        if self.colorbar is not None:
+            self.reset()
+        self.canvas.axes.set_xlabel(xlabel)
+        self.canvas.axes.set_ylabel(ylabel)
+        (line,) = self.canvas.axes.plot(x_values, result.nominal, label=str(label))
+        low, high = result.envelope()
+        self.canvas.axes.fill_between(
+            x_values,
+            low,
+            high,
+            color=line.get_color(),
+            alpha=0.25,
+            label=f"{min(result.percentiles)}-{max(result.percentiles)} % ({result.samples} Stichproben)",
+        )
+        self.canvas.axes.plot(
+            x_values,
+            result.mean,
+            color=line.get_color(),
+            linestyle="--",
+            label="Mittelwert",
+        )
+        self.canvas.axes.legend()
+
+    def update_merit(self, job_id, merit):
+        if job_id == self.job_id:
+            self.progress_bar.setFormat(f"Gütefunktion {merit:.4g}")
+
+    def finish_optimization(self, job_id, result):
+        if job_id != self.job_id:
+            return
+        self.hide_progress()
+        for row, thickness in enumerate(result.thicknesses, start=1):
+            self.grid.cellWidget(row, 1).setText(f"{thickness:.2f}")
+        self.plot_function()
+        QMessageBox.information(self, "Optimierung", str(result))
+
+    def update_cache_label(self):
+        stats = result_cache.stats()
+        self.cache_label.setText(
+            f"Ergebnis-Cache: {stats['hits']} Treffer, {stats['misses']} Fehlzugriffe, "
+            f"{stats['entries']} Einträge, {stats['bytes'] / 2**20:.1f} MB"
+        )
+
+    def toggle_profiling(self, checked):
+        if checked:
+            instrumentation.enable()
+        else:
+            instrumentation.disable()
+            self.statusBar().clearMessage()
+            self.statusBar().setToolTip("")
+
+    def update_progress(self, job_id, value):
+        if job_id == self.job_id:
+            self.progress_bar.setValue(value)
+
+    def finish_calculation(self, job_id, results, on_result):
+        if job_id != self.job_id:
+            return
+        self.hide_progress()
+        self.update_cache_label()
+        if instrumentation.enabled:
+            elapsed = time.perf_counter() - self.started
+            self.statusBar().showMessage(
+                f"Gesamt {elapsed * 1e3:.1f} ms | {instrumentation.summary()}"
+            )
+            self.statusBar().setToolTip(instrumentation.to_json())
+        try:
+            on_result(results)
+            self.canvas.draw()
         except Exception as e:
             QMessageBox.critical(
                 self,
@@ -185,6 +942,86 @@ class MainWindow(QMainWindow):
                 f"Ein unerwarteter Fehler ist aufgetreten: {e}",
             )
 
+    def calculation_failed(self, job_id, error):
+        if job_id != self.job_id:
+            return
+        self.hide_progress()
+        if isinstance(error, (ValueError, ZeroDivisionError, ArithmeticError)):
+            QMessageBox.warning(
+                self,
+                "Fehlermeldung",
+                f"Ungültige Auswahl oder Berechnungsfehler: {error}",
+            )
+        else:
+            QMessageBox.critical(
+                self,
+                "Kritischer Fehler",
+                f"Ein unerwarteter Fehler ist aufgetreten: {error}",
+            )
+
+    def cancel_calculation(self):
+        for thread in self.threads:
+            thread.cancel()
+        self.job_id += 1
+        self.hide_progress()
+
+    def hide_progress(self):
+        self.progress_bar.setVisible(False)
+        self.progress_bar.resetFormat()
+        self.cancel_button.setVisible(False)
+
+    def closeEvent(self, event):
+        for thread in list(self.threads):
+            thread.cancel()
+            thread.wait()
+        super().closeEvent(event)
+
+    def plot_curves(self, x_values, curves, label, xlabel, ylabel):
+        if self.colorbar is not None:
+            self.reset()
+        self.canvas.axes.set_xlabel(xlabel)
+        self.canvas.axes.set_ylabel(ylabel)
+        for polarization, reflect_list in curves.items():
+            self.canvas.axes.plot(
+                x_values, reflect_list, label=str(label + [polarization])
+            )
+        self.canvas.axes.legend()
+
+    def show_result(self, results):
+        QMessageBox.information(
+            self,
+            "Ergebnis",
+            "\n".join(
+                f"Reflexionsgrad R ({polarization}): {reflect_list[0]:.4f}"
+                for polarization, reflect_list in merge_curves(results).items()
+            ),
+        )
+
+    def plot_map(self, wavelength_lists, angles_deg, reflect_map, label):
+        self.reset()
+        mesh = self.canvas.axes.pcolormesh(
+            wavelength_lists * 1e9,
+            angles_deg,
+            reflect_map.T,
+            shading="auto",
+            cmap="viridis",
+        )
+        self.canvas.axes.contour(
+            wavelength_lists * 1e9,
+            angles_deg,
+            reflect_map.T,
+            levels=5,
+            colors="white",
+            linewidths=0.5,
+        )
+        self.colorbar = self.canvas.figure.colorbar(
+            mesh, ax=self.canvas.axes, label="Reflexionsgrad R"
+        )
+        self.canvas.axes.grid(False)
+        self.canvas.axes.set_title(str(label))
+        self.canvas.axes.set_xlabel("Wellenlänge [nm]")
+        self.canvas.axes.set_ylabel("Einfallswinkel (\u03c6)")
+
     def validate_inputs(self):
         self.new_material_list = []
         self.wavelengths = self.wavelength.text().split("-")
@@ -237,6 +1074,10 @@ class MainWindow(QMainWindow):
                         raise ValueError(
                             "Dicke einer Schicht muss positiv und endlich sein."
                         )
+                    incoherent = self.grid.cellWidget(i, 3)
+                    m.incoherent = isinstance(incoherent, QCheckBox) and (
+                        incoherent.isChecked()
+                    )
                 elif i == 0 or i == self.grid.rowCount() - 1:
                     if m.d != np.inf:
                         raise ValueError(
@@ -245,12 +1086,8 @@ class MainWindow(QMainWindow):
                 self.new_material_list.append(m)
             except (ValueError, AttributeError) as ve:
                 raise ValueError(f"Fehler in Zeile {i + 1}: {ve}")
-        if (
-            len(self.wavelengths) > 2
-            or len(self.angles) > 2
-            or (len(self.wavelengths) == 2 and len(self.angles) == 2)
-        ):
-            raise ValueError("Bitte maximal einen Bereich (x-y) angeben.")
+        if len(self.wavelengths) > 2 or len(self.angles) > 2:
+            raise ValueError("Bitte maximal einen Bereich (x-y) pro Feld angeben.")
         if len(self.wavelengths) > 1:
             if len(self.wavelengths) != 2:
                 raise ValueError(
@@ -258,16 +1095,11 @@ class MainWindow(QMainWindow):
                 )
             if float(self.wavelengths[0]) >= float(self.wavelengths[1]):
                 raise ValueError("Erste Wellenlänge muss kleiner als zweite sein.")
-        elif len(self.angles) > 1:
+        if len(self.angles) > 1:
             if len(self.angles) != 2:
                 raise ValueError("Winkelbereich muss 1.Winkel-2.Winkel sein.")
             if float(self.angles[0]) >= float(self.angles[1]):
                 raise ValueError("Erster Winkel muss kleiner als zweiter sein.")
-        else:
-            if len(self.wavelengths) != 1 and len(self.angles) != 1:
-                raise ValueError(
-                    "Geben Sie entweder einen Wellenlängenbereich oder einen Winkelbereich an, oder nur eine Wellenlänge und einen Winkel."
-                )
 
     def delete_Row(self, combobox: QComboBox):
         try:
@@ -315,7 +1147,7 @@ class MainWindow(QMainWindow):
             combobox0 = QComboBox()
             combobox0.setPlaceholderText("Presets")
             combobox0.activated.connect(lambda: self.set_values(combobox0, textfield_d))
-            for material in material_list:
+            for material in material_library:
                 combobox0.addItem(material.name, material)
             add_button = QPushButton("+")
             add_button.setStyleSheet(
@@ -349,6 +1181,11 @@ class MainWindow(QMainWindow):
             else:
                 self.grid.setCellWidget(index, 2, button_widget)
                 textfield_d.setText("100")
+                incoherent = QCheckBox()
+                incoherent.setToolTip(
+                    "Dicke Schicht (z.B. Substrat mit Rückseite) ohne Interferenz rechnen"
+                )
+                self.grid.setCellWidget(index, 3, incoherent)
         except Exception as e:
             QMessageBox.critical(
                 self, "Kritischer Fehler", f"Fehler beim Einfügen der Zeile: {e}"
@@ -371,6 +1208,9 @@ class MainWindow(QMainWindow):
 
     def reset(self):
         try:
+            if self.colorbar is not None:
+                self.colorbar.remove()
+                self.colorbar = None
             self.canvas.axes.clear()
             self.canvas.axes.set_title("Reflexionsspektrum")
             self.canvas.axes.set_xlabel("Wellenlänge [nm]")
@@ -396,7 +1236,7 @@ class MainWindow(QMainWindow):
                 current_idx = combobox.currentIndex()
                 combobox.blockSignals(True)
                 combobox.clear()
-                for material in material_list:
+                for material in material_library:
                     combobox.addItem(material.name, material)
                 combobox.setCurrentIndex(current_idx)
                 combobox.blockSignals(False)
@@ -447,7 +1287,7 @@ class MaterialDialog(QDialog):
                     raise SyntaxError("Ungültige Formel im Brechungsindex-Feld.")
                 except (ValueError, TypeError):
                     raise ValueError("Ungültiger Wert für Brechungsindex.")
-                material_list.append(
+                material_library.add(
                     Material(
                         name=self.namef.text(),
                         n_type=self.calc_type.currentData(),
@@ -483,7 +1323,7 @@ class MaterialDialog(QDialog):
                     )
                 if any(c <= 0 for c in clistfloat):
                     raise ValueError("Alle C-Koeffizienten müssen positiv sein.")
-                material_list.append(
+                material_library.add(
                     Material(
                         name=self.namef.text(),
                         n_type=self.calc_type.currentData(),
@@ -497,12 +1337,13 @@ class MaterialDialog(QDialog):
                 table_data = self.parse_table_data(self.table.toPlainText())
                 if table_data is None:
                     return
-                material_list.append(
+                material_library.add(
                     Material(
                         name=self.namef.text(),
                         n_type=self.calc_type.currentData(),
                         d=100,
                         table=table_data,
+                        interpolation=self.interpolation.currentData(),
                     )
                 )
             elif self.calc_type.currentData() == 2:
@@ -512,7 +1353,7 @@ class MaterialDialog(QDialog):
                     raise ValueError(
                         "Die Formel muss 'x' für die Wellenlänge enthalten."
                     )
-                material_list.append(
+                material_library.add(
                     Material(
                         name=self.namef.text(),
                         n_type=self.calc_type.currentData(),
@@ -520,10 +1361,8 @@ class MaterialDialog(QDialog):
                         formula=self.formula.text(),
                     )
                 )
-            jsonlist = [i.toJson() for i in material_list]
             try:
-                with open("Material.json", "w") as file:
-                    json.dump(jsonlist, file, indent=4)
+                material_library.save()
                 self.accept()
             except IOError as ioe:
                 raise IOError(f"Fehler beim Speichern der Materialdatei: {ioe}")
@@ -590,6 +1429,7 @@ class MaterialDialog(QDialog):
                 self.imaginary.setEnabled(False)
                 self.formula.setEnabled(False)
                 self.table.setEnabled(False)
+                self.interpolation.setEnabled(False)
             elif self.calc_type.currentData() == 0:
                 self.coefficientA.setEnabled(False)
                 self.coefficientB.setEnabled(False)
@@ -598,6 +1438,7 @@ class MaterialDialog(QDialog):
                 self.imaginary.setEnabled(True)
                 self.formula.setEnabled(False)
                 self.table.setEnabled(False)
+                self.interpolation.setEnabled(False)
             elif self.calc_type.currentData() == 2:
                 self.coefficientA.setEnabled(False)
                 self.coefficientB.setEnabled(False)
@@ -606,6 +1447,7 @@ class MaterialDialog(QDialog):
                 self.imaginary.setEnabled(False)
                 self.formula.setEnabled(True)
                 self.table.setEnabled(False)
+                self.interpolation.setEnabled(False)
             elif self.calc_type.currentData() == 3:
                 self.coefficientA.setEnabled(False)
                 self.coefficientB.setEnabled(False)
@@ -614,6 +1456,7 @@ class MaterialDialog(QDialog):
                 self.imaginary.setEnabled(False)
                 self.formula.setEnabled(False)
                 self.table.setEnabled(True)
+                self.interpolation.setEnabled(True)
             else:
                 self.coefficientA.setEnabled(False)
                 self.coefficientB.setEnabled(False)
@@ -622,6 +1465,7 @@ class MaterialDialog(QDialog):
                 self.imaginary.setEnabled(False)
                 self.formula.setEnabled(False)
                 self.table.setEnabled(False)
+                self.interpolation.setEnabled(False)
         except Exception as e:
             QMessageBox.critical(
                 self,
@@ -695,9 +1539,14 @@ class MaterialDialog(QDialog):
         self.table_label = QLabel("Tabelle")
         self.table = QPlainTextEdit()
         self.table.setEnabled(False)
+        self.interpolation = QComboBox()
+        self.interpolation.addItem("Linear", userData="linear")
+        self.interpolation.addItem("Kubisch (PCHIP)", userData="cubic")
+        self.interpolation.setEnabled(False)
         layouth = QHBoxLayout()
         layouth.addWidget(self.table_label)
         layouth.addWidget(self.table)
+        layouth.addWidget(self.interpolation)
         layoutv.addLayout(layouth)
 
         self.confirm = QPushButton("Bestätigen")
@@ -708,6 +1557,155 @@ class MaterialDialog(QDialog):
         self.confirm.clicked.connect(self.check_index)
 
 
+class OptimizationDialog(QDialog):
+    """Abfrage von Zielspektrum und Einstellungen der Dickenoptimierung."""
+
+    def __init__(self, parent: QMainWindow):
+        super().__init__(parent)
+        self.settings = None
+        self.target_file = None
+        self.setWindowTitle("Schichtdicken optimieren")
+        self.setup_UI()
+
+    def choose_file(self):
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Zielspektrum laden", "", "CSV (*.csv *.txt)"
+        )
+        if path:
+            self.target_file = path
+            self.target.setText(path)
+            self.target.setEnabled(False)
+
+    def check_settings(self):
+        try:
+            settings = {
+                "quantity": self.quantity.currentData(),
+                "target_file": self.target_file,
+                "target": None,
+                "tolerance": float(self.tolerance.text() or 0.01),
+                "min_thickness": float(self.min_thickness.text() or 1),
+                "starts": int(self.starts.text() or 1),
+                "iterations": int(self.iterations.text() or 200),
+            }
+            if self.target_file is None:
+                settings["target"] = float(self.target.text())
+                if not 0 <= settings["target"] <= 1:
+                    raise ValueError("Zielwert muss zwischen 0 und 1 liegen.")
+            if settings["tolerance"] <= 0:
+                raise ValueError("Toleranz muss größer als 0 sein.")
+            if settings["min_thickness"] <= 0:
+                raise ValueError("Mindestdicke muss größer als 0 sein.")
+            if settings["starts"] < 1 or settings["iterations"] < 1:
+                raise ValueError("Starts und Iterationen müssen mindestens 1 sein.")
+        except ValueError as e:
+            QMessageBox.warning(self, "Fehlermeldung", f"Ungültige Eingabe: {e}")
+            return
+        self.settings = settings
+        self.accept()
+
+    def setup_UI(self):
+        layoutv = QVBoxLayout()
+
+        self.quantity = QComboBox()
+        self.quantity.addItem("Reflexionsgrad R", userData="R")
+        self.quantity.addItem("Transmissionsgrad T", userData="T")
+        self.target = QLineEdit()
+        self.target.setPlaceholderText("Zielwert 0-1")
+        self.target_button = QPushButton("Datei...")
+        self.target_button.setToolTip(
+            "CSV mit Wellenlänge in nm, Zielwert und optional Gewicht"
+        )
+        self.target_button.clicked.connect(self.choose_file)
+        layouth = QHBoxLayout()
+        layouth.addWidget(QLabel("Ziel: "))
+        layouth.addWidget(self.quantity)
+        layouth.addWidget(self.target)
+        layouth.addWidget(self.target_button)
+        layoutv.addLayout(layouth)
+
+        self.tolerance = QLineEdit()
+        self.tolerance.setPlaceholderText("Toleranz, z.B. 0.01")
+        self.min_thickness = QLineEdit()
+        self.min_thickness.setPlaceholderText("Mindestdicke in nm (1)")
+        layouth = QHBoxLayout()
+        layouth.addWidget(QLabel("Toleranz / Mindestdicke: "))
+        layouth.addWidget(self.tolerance)
+        layouth.addWidget(self.min_thickness)
+        layoutv.addLayout(layouth)
+
+        self.starts = QLineEdit()
+        self.starts.setPlaceholderText("Startpunkte (1 = nur lokal)")
+        self.iterations = QLineEdit()
+        self.iterations.setPlaceholderText("Max. Iterationen (200)")
+        layouth = QHBoxLayout()
+        layouth.addWidget(QLabel("Starts / Iterationen: "))
+        layouth.addWidget(self.starts)
+        layouth.addWidget(self.iterations)
+        layoutv.addLayout(layouth)
+
+        self.confirm = QPushButton("Optimierung starten")
+        self.confirm.clicked.connect(self.check_settings)
+        layoutv.addWidget(self.confirm)
+        self.setLayout(layoutv)
+
+
+class ToleranceDialog(QDialog):
+    """Abfrage der Fertigungsfehler für die Monte-Carlo-Toleranzanalyse."""
+
+    def __init__(self, parent: QMainWindow):
+        super().__init__(parent)
+        self.settings = None
+        self.setWindowTitle("Toleranzanalyse")
+        self.setup_UI()
+
+    def check_settings(self):
+        try:
+            settings = {
+                "thickness_error": float(self.thickness_error.text() or 1) / 100,
+                "index_error": float(self.index_error.text() or 0),
+                "samples": int(self.samples.text() or 1000),
+                "distribution": self.distribution.currentData(),
+            }
+            if settings["thickness_error"] < 0 or settings["index_error"] < 0:
+                raise ValueError("Fehler dürfen nicht negativ sein.")
+            if settings["samples"] < 1:
+                raise ValueError("Es wird mindestens eine Stichprobe benötigt.")
+        except ValueError as e:
+            QMessageBox.warning(self, "Fehlermeldung", f"Ungültige Eingabe: {e}")
+            return
+        self.settings = settings
+        self.accept()
+
+    def setup_UI(self):
+        layoutv = QVBoxLayout()
+
+        self.thickness_error = QLineEdit()
+        self.thickness_error.setPlaceholderText("Dickenfehler in % (1)")
+        self.index_error = QLineEdit()
+        self.index_error.setPlaceholderText("Indexfehler Δn (0)")
+        layouth = QHBoxLayout()
+        layouth.addWidget(QLabel("Fehler pro Schicht: "))
+        layouth.addWidget(self.thickness_error)
+        layouth.addWidget(self.index_error)
+        layoutv.addLayout(layouth)
+
+        self.distribution = QComboBox()
+        self.distribution.addItem("Normalverteilt (σ)", userData=DISTRIBUTIONS[0])
+        self.distribution.addItem("Gleichverteilt (±)", userData=DISTRIBUTIONS[1])
+        self.samples = QLineEdit()
+        self.samples.setPlaceholderText("Stichproben (1000)")
+        layouth = QHBoxLayout()
+        layouth.addWidget(QLabel("Verteilung / Stichproben: "))
+        layouth.addWidget(self.distribution)
+        layouth.addWidget(self.samples)
+        layoutv.addLayout(layouth)
+
+        self.confirm = QPushButton("Analyse starten")
+        self.confirm.clicked.connect(self.check_settings)
+        layoutv.addWidget(self.confirm)
+        self.setLayout(layoutv)
+
+
 try:
     app = QApplication(sys.argv)
     app.setStyle("Fusion")
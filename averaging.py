@@ -0,0 +1,224 @@
+import numpy as np
+
+from main import reflectance, reflectance_sp
+
+
+# /////////////////////////
+#   Über Bandbreite und Strahlkegel gemittelte Reflexion
+#
+#   Jeder Rasterpunkt (λ0, θ0) wird durch Gauß-Legendre-Knoten ersetzt:
+#       spektral   λ = λ0 + Δλ/2 · x       gewichtet mit Quelle(λ) · Detektor(λ)
+#       Kegel      ρ ∈ [0, α], φ ∈ [0, π]  gewichtet mit sin ρ (gleichmäßig gefüllte Pupille)
+#   Der Einfallswinkel eines Strahls im Kegel ist
+#       cos θ = cos θ0 cos ρ + sin θ0 sin ρ cos φ
+#   Alle Knoten werden als zusätzliche Rasterachsen in einem einzigen Aufruf von
+#   reflectance berechnet und anschließend gewichtet summiert. Die Polarisation wird
+#   dabei pro Strahl auf dessen eigene Einfallsebene bezogen.
+#
+#   Ein über ein ganzes Band gemittelter Wert ergibt sich mit der Bandmitte als
+#   Wellenlänge, der Bandbreite als bandwidth und ausreichend vielen spectral_nodes.
+# ////////////////////////
+def cone_half_angle(f_number: float):
+    """Halber Öffnungswinkel des Strahlkegels zu einer Blendenzahl.
+
+    Args:
+        f_number (float): Blendenzahl N = f / D.
+
+    Returns:
+        Halber Öffnungswinkel in Radiant, arctan(1 / (2N)).
+
+    Raises:
+        ValueError: Bei einer Blendenzahl kleiner oder gleich 0.
+    """
+    if f_number <= 0:
+        raise ValueError("Blendenzahl muss größer als 0 sein.")
+    return float(np.arctan(1 / (2 * f_number)))
+
+
+def _spectral_weight(spectrum, wavelengths):
+    """Wertet ein Quell- oder Detektorspektrum an den Knoten aus.
+
+    Args:
+        spectrum (callable | tuple): None für ein flaches Spektrum, eine Funktion der
+            Wellenlänge in Meter oder ein Tupel (Wellenlängen in Meter, Werte), das
+            linear interpoliert und außerhalb mit 0 fortgesetzt wird.
+        wavelengths (np.ndarray): Wellenlängen der Knoten in Meter.
+
+    Returns:
+        Gewichte in der Form von wavelengths.
+    """
+    if spectrum is None:
+        return np.ones(wavelengths.shape)
+    if callable(spectrum):
+        values = spectrum(wavelengths)
+    else:
+        x, y = spectrum
+        values = np.interp(wavelengths, x, y, left=0.0, right=0.0)
+    return np.broadcast_to(np.asarray(values, dtype=float), wavelengths.shape)
+
+
+def quadrature_nodes(
+    wavelengths,
+    theta,
+    bandwidth: float = 0.0,
+    cone: float = 0.0,
+    source=None,
+    detector=None,
+    spectral_nodes: int = 8,
+    angular_nodes: int = 4,
+):
+    """Bildet die Quadraturknoten und -gewichte für alle Rasterpunkte.
+
+    Ohne Bandbreite bzw. Kegel entfällt die jeweilige Achse; bei senkrechtem Einfall
+    aller Punkte genügt ein einzelner Azimutknoten.
+
+    Args:
+        wavelengths (list | float): Nominelle Wellenlängen in Meter.
+        theta (list | float): Nominelle Einfallswinkel in Radiant, wird gegen die
+            Wellenlängen gebroadcastet.
+        bandwidth (float): Breite des spektralen Fensters in Meter.
+        cone (float): Halber Öffnungswinkel des Strahlkegels in Radiant.
+        source (callable | tuple): Quellspektrum, siehe _spectral_weight.
+        detector (callable | tuple): Detektorempfindlichkeit, siehe _spectral_weight.
+        spectral_nodes (int): Anzahl der spektralen Knoten.
+        angular_nodes (int): Anzahl der Knoten in ρ und in φ.
+
+    Returns:
+        Tupel (Form des Rasters, Wellenlängen (B, S, 1), Winkel (B, 1, A), Gewichte
+        (B, S, A)) mit B Rasterpunkten, S spektralen und A Winkelknoten; die Gewichte
+        summieren sich pro Rasterpunkt zu 1.
+
+    Raises:
+        ValueError: Bei negativer Bandbreite, einem Kegel über 90° hinaus oder einem
+            Fenster ohne spektrales Gewicht.
+    """
+    if bandwidth < 0 or cone < 0:
+        raise ValueError("Bandbreite und Kegelwinkel dürfen nicht negativ sein.")
+    wl0 = np.asarray(wavelengths, dtype=float)
+    th0 = np.asarray(theta, dtype=float)
+    shape = np.broadcast_shapes(wl0.shape, th0.shape)
+    wl0 = np.broadcast_to(wl0, shape).reshape(-1, 1, 1)
+    th0 = np.broadcast_to(th0, shape).reshape(-1, 1, 1)
+    if np.any(th0 + cone >= np.pi / 2):
+        raise ValueError("Einfallswinkel und Kegel müssen unter 90° bleiben.")
+
+    if bandwidth > 0:
+        x, w = np.polynomial.legendre.leggauss(spectral_nodes)
+        wl = wl0 + bandwidth / 2 * x[:, np.newaxis]
+    else:
+        w = np.ones(1)
+        wl = wl0
+    spectral = (
+        w[:, np.newaxis] * _spectral_weight(source, wl) * _spectral_weight(detector, wl)
+    )
+    total = spectral.sum(axis=1, keepdims=True)
+    if np.any(total <= 0):
+        raise ValueError(
+            "Quelle und Detektor haben im spektralen Fenster kein Gewicht."
+        )
+    spectral = spectral / total
+
+    if cone > 0:
+        x, w = np.polynomial.legendre.leggauss(angular_nodes)
+        rho, w_rho = cone / 2 * (x + 1), w * np.sin(cone / 2 * (x + 1))
+        if np.any(th0):
+            phi, w_phi = np.pi / 2 * (x + 1), w
+        else:
+            phi, w_phi = np.zeros(1), np.ones(1)
+        rho, phi = (a.ravel() for a in np.meshgrid(rho, phi, indexing="ij"))
+        angular = np.outer(w_rho, w_phi).ravel()
+        angular /= angular.sum()
+        cos = np.cos(th0) * np.cos(rho) + np.sin(th0) * np.sin(rho) * np.cos(phi)
+        th = np.arccos(np.clip(cos, -1, 1))
+    else:
+        angular = np.ones(1)
+        th = th0
+    return shape, wl, th, spectral * angular
+
+
+def _averaged(evaluate, wavelengths, theta, **options):
+    """Wertet evaluate auf allen Knoten aus und mittelt mit den Quadraturgewichten.
+
+    Args:
+        evaluate (callable): Erhält Wellenlängen und Winkel der Knoten und liefert ein
+            flaches Array oder ein Tupel flacher Arrays über das gebroadcastete Raster.
+        wavelengths (list | float): Nominelle Wellenlängen in Meter.
+        theta (list | float): Nominelle Einfallswinkel in Radiant.
+        **options: Argumente für quadrature_nodes.
+
+    Returns:
+        Liste gemittelter Arrays in der Form des nominellen Rasters.
+    """
+    shape, wl, th, weights = quadrature_nodes(wavelengths, theta, **options)
+    values = evaluate(wl, th)
+    if not isinstance(values, tuple):
+        values = (values,)
+    return [
+        (v.reshape(weights.shape) * weights).sum(axis=(1, 2)).reshape(shape)
+        for v in values
+    ]
+
+
+def averaged_reflectance(
+    material_list,
+    wavelengths,
+    polarization,
+    theta,
+    bandwidth: float = 0.0,
+    cone: float = 0.0,
+    source=None,
+    detector=None,
+    spectral_nodes: int = 8,
+    angular_nodes: int = 4,
+):
+    """Berechnet den über Bandbreite, Spektren und Strahlkegel gemittelten Reflexionsgrad.
+
+    Args:
+        material_list (list): Liste von Material-Objekten.
+        wavelengths (list | float): Nominelle Wellenlängen (Fenstermitten) in Meter.
+        polarization (str | float): Polarisation wie bei reflectance.
+        theta (list | float): Einfallswinkel des Hauptstrahls in Radiant.
+        bandwidth (float): Breite des spektralen Fensters in Meter, 0 für monochromatisch.
+        cone (float): Halber Öffnungswinkel in Radiant, z.B. aus cone_half_angle.
+        source (callable | tuple): Quellspektrum als Funktion der Wellenlänge in Meter
+            oder Tupel (Wellenlängen, Werte).
+        detector (callable | tuple): Detektorempfindlichkeit wie source.
+        spectral_nodes (int): Anzahl der Gauß-Knoten über das spektrale Fenster.
+        angular_nodes (int): Anzahl der Gauß-Knoten in Radius und Azimut des Kegels.
+
+    Returns:
+        Gemittelte Reflexionsgrade in der gebroadcasteten Form von wavelengths und theta.
+    """
+    (R,) = _averaged(
+        lambda wl, th: reflectance(material_list, wl, polarization, th),
+        wavelengths,
+        theta,
+        bandwidth=bandwidth,
+        cone=cone,
+        source=source,
+        detector=detector,
+        spectral_nodes=spectral_nodes,
+        angular_nodes=angular_nodes,
+    )
+    return R
+
+
+def averaged_reflectance_sp(material_list, wavelengths, theta, **options):
+    """Wie averaged_reflectance, aber s- und p-Anteil aus einem gemeinsamen Durchlauf.
+
+    Args:
+        material_list (list): Liste von Material-Objekten.
+        wavelengths (list | float): Nominelle Wellenlängen in Meter.
+        theta (list | float): Einfallswinkel des Hauptstrahls in Radiant.
+        **options: bandwidth, cone, source, detector, spectral_nodes, angular_nodes.
+
+    Returns:
+        Tupel (R_s, R_p) der gemittelten Reflexionsgrade.
+    """
+    R_s, R_p = _averaged(
+        lambda wl, th: reflectance_sp(material_list, wl, th),
+        wavelengths,
+        theta,
+        **options,
+    )
+    return R_s, R_p
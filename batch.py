@@ -0,0 +1,302 @@
+import argparse
+import copy
+import csv
+import json
+import sys
+import warnings
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+from itertools import islice
+
+import numpy as np
+
+from main import (
+    PRECISIONS,
+    MaterialLibrary,
+    PrecisionWarning,
+    cached_reflectance,
+    cached_reflectance_map,
+    material_library,
+)
+
+
+# /////////////////////////
+#   Stapelverarbeitung ohne Benutzeroberfläche
+#
+#   Eine Schichtsystem-Definition (JSON-Objekt, als JSON-Liste oder eine pro Zeile):
+#   {
+#       "name": "AR-1",
+#       "layers": [["Luft", "inf"], ["MgF2", 100], ["BK7", "inf"]],
+#       "wavelengths": [400, 800, 400],   Wellenlänge in nm oder [Start, Ende, Anzahl]
+#       "angles": 0,                      Winkel in Grad oder [Start, Ende, Anzahl]
+#       "polarization": "Senkrecht",
+#       "precision": "single"             optional, sonst der Wert von --precision
+#   }
+# ////////////////////////
+def read_definitions(path):
+    """Liest Schichtsystem-Definitionen nacheinander aus einer Datei.
+
+    Unterstützt wird eine JSON-Liste (.json) oder eine Definition pro Zeile (.jsonl).
+
+    Args:
+        path (str): Pfad zur Definitionsdatei.
+
+    Yields:
+        Dictionary pro Schichtsystem.
+    """
+    if path.endswith(".json"):
+        with open(path, "r") as file:
+            yield from json.load(file)
+        return
+    with open(path, "r") as file:
+        for line in file:
+            if line.strip() and not line.lstrip().startswith("#"):
+                yield json.loads(line)
+
+
+def _axis(value, unit):
+    """Wandelt eine Wert- oder Bereichsangabe in ein Array um.
+
+    Args:
+        value (float | list): Einzelwert oder [Start, Ende, Anzahl].
+        unit (float): Umrechnungsfaktor in SI-Einheiten bzw. Radiant.
+
+    Returns:
+        Array der Rasterwerte.
+    """
+    if isinstance(value, (int, float)):
+        return np.array([float(value)]) * unit
+    if len(value) != 3:
+        raise ValueError("Bereich muss als [Start, Ende, Anzahl] angegeben werden.")
+    return np.linspace(float(value[0]), float(value[1]), int(value[2])) * unit
+
+
+def build_stack(definition, library):
+    """Erzeugt die Material-Liste eines Schichtsystems aus der Materialbibliothek.
+
+    Args:
+        definition (dict): Schichtsystem-Definition.
+        library (MaterialLibrary): Materialbibliothek.
+
+    Returns:
+        Liste von Material-Objekten mit gesetzten Dicken.
+    """
+    stack = []
+    for name, thickness in definition["layers"]:
+        if name not in library:
+            raise ValueError(f"Unbekanntes Material: {name}")
+        m = copy.copy(library[name])
+        m.d = (
+            np.inf
+            if str(thickness).lower() in ("inf", "unendlich")
+            else float(thickness)
+        )
+        stack.append(m)
+    if len(stack) < 2 or stack[0].d != np.inf or stack[-1].d != np.inf:
+        raise ValueError(
+            "Umgebendes Medium und Substrat müssen vorhanden und unendlich dick sein."
+        )
+    return stack
+
+
+def run_definition(definition, library=None, precision="double"):
+    """Berechnet ein Schichtsystem.
+
+    Sind sowohl Wellenlängen als auch Winkel als Bereich angegeben, wird das
+    vollständige Raster R[λ, θ] berechnet. Wiederholt auftretende Systeme werden
+    über den result_cache nur einmal pro Prozess gerechnet.
+
+    Args:
+        definition (dict): Schichtsystem-Definition.
+        library (MaterialLibrary): Materialbibliothek, standardmäßig die globale.
+        precision (str): Rechengenauigkeit, falls die Definition keine angibt.
+
+    Returns:
+        Tupel aus Name und den Spalten Wellenlänge in nm, Winkel in Grad und R.
+    """
+    if library is None:
+        library = material_library
+    stack = build_stack(definition, library)
+    wavelengths = _axis(definition["wavelengths"], 1e-9)
+    angles = _axis(definition.get("angles", 0), np.pi / 180)
+    polarization = definition.get("polarization", "Senkrecht")
+    precision = definition.get("precision", precision)
+    if wavelengths.size > 1 and angles.size > 1:
+        R = cached_reflectance_map(
+            stack, wavelengths, polarization, angles, precision
+        ).ravel()
+        wavelengths, angles = (
+            a.ravel() for a in np.meshgrid(wavelengths, angles, indexing="ij")
+        )
+    else:
+        R = cached_reflectance(stack, wavelengths, polarization, angles, precision)
+        wavelengths, angles = (
+            a.ravel() for a in np.broadcast_arrays(wavelengths, angles)
+        )
+    return definition.get("name", ""), wavelengths * 1e9, angles * 180 / np.pi, R
+
+
+@lru_cache
+def _library(path):
+    """Liefert pro Prozess eine einzige Bibliothek je Pfad."""
+    return MaterialLibrary(path) if path else material_library
+
+
+def _run_safe(definition, library_path=None, precision="double"):
+    """Führt run_definition aus und liefert Fehler als Wert zurück, damit ein Pool weiterläuft.
+
+    Zu ungenaue Rechnungen in einfacher Genauigkeit werden mit dem Namen des
+    Schichtsystems gemeldet, das Ergebnis wird trotzdem geschrieben.
+    """
+    name = definition.get("name", "")
+    try:
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always", PrecisionWarning)
+            result = run_definition(definition, _library(library_path), precision)
+    except Exception as e:
+        return None, f"{name}: {e}"
+    for warning in caught:
+        if issubclass(warning.category, PrecisionWarning):
+            print(
+                f"Warnung in Schichtsystem {name}: {warning.message}", file=sys.stderr
+            )
+        else:
+            warnings.warn_explicit(
+                warning.message, warning.category, warning.filename, warning.lineno
+            )
+    return result, None
+
+
+def iter_results(
+    definitions,
+    workers: int = 1,
+    block: int = 64,
+    library_path: str = None,
+    precision: str = "double",
+):
+    """Berechnet Schichtsysteme und liefert die Ergebnisse in Eingabereihenfolge.
+
+    Bei mehreren Workern werden die Definitionen blockweise auf einen Prozess-Pool
+    verteilt, sodass nie mehr als ein Block an Ergebnissen im Speicher liegt.
+
+    Args:
+        definitions (iterable): Schichtsystem-Definitionen.
+        workers (int): Anzahl der Prozesse, 1 für eine sequenzielle Berechnung.
+        block (int): Anzahl der gleichzeitig verteilten Definitionen.
+        library_path (str): Pfad einer abweichenden Materialdatei.
+        precision (str): "double" oder "single" für Definitionen ohne eigene Angabe.
+
+    Yields:
+        Tupel aus Ergebnis (oder None) und Fehlermeldung (oder None).
+    """
+    definitions = iter(definitions)
+    run = partial(_run_safe, library_path=library_path, precision=precision)
+    if workers <= 1:
+        for definition in definitions:
+            yield run(definition)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while chunk := list(islice(definitions, block)):
+            yield from executor.map(run, chunk)
+
+
+class CsvWriter:
+    """Schreibt Ergebnisse zeilenweise in eine CSV-Datei."""
+
+    def __init__(self, path):
+        self.file = open(path, "w", newline="")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(["stack", "wavelength_nm", "angle_deg", "R"])
+
+    def write(self, name, wavelengths, angles, R):
+        self.writer.writerows(
+            (name, f"{wl:.6g}", f"{angle:.6g}", f"{r:.10g}")
+            for wl, angle, r in zip(wavelengths, angles, R)
+        )
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class NpzWriter:
+    """Schreibt jedes Schichtsystem als eigenes Array-Tripel in ein .npz-Archiv.
+
+    Die Einträge werden einzeln an das Archiv angehängt, das mit np.load gelesen
+    werden kann (Schlüssel "<Nr>_<Name>/wavelength_nm", ".../angle_deg", ".../R").
+    """
+
+    def __init__(self, path):
+        self.archive = zipfile.ZipFile(path, "w", zipfile.ZIP_STORED, allowZip64=True)
+        self.count = 0
+
+    def write(self, name, wavelengths, angles, R):
+        prefix = f"{self.count:06d}_{name}"
+        for key, values in (
+            ("wavelength_nm", wavelengths),
+            ("angle_deg", angles),
+            ("R", R),
+        ):
+            with self.archive.open(f"{prefix}/{key}.npy", "w", force_zip64=True) as f:
+                np.lib.format.write_array(f, np.ascontiguousarray(values))
+        self.count += 1
+
+    def close(self):
+        self.archive.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Berechnet Reflexionsspektren vieler Schichtsysteme ohne Benutzeroberfläche."
+    )
+    parser.add_argument("definitions", help="Definitionsdatei (.json oder .jsonl)")
+    parser.add_argument(
+        "-o", "--output", required=True, help="Ausgabe (.csv oder .npz)"
+    )
+    parser.add_argument(
+        "-w", "--workers", type=int, default=1, help="Anzahl paralleler Prozesse"
+    )
+    parser.add_argument(
+        "-l", "--library", help="Materialdatei, standardmäßig Material.json"
+    )
+    parser.add_argument(
+        "-p",
+        "--precision",
+        choices=list(PRECISIONS),
+        default="double",
+        help="Rechengenauigkeit; 'single' spart Speicher und Zeit und wird auf "
+        "Stichproben gegen 'double' geprüft",
+    )
+    args = parser.parse_args(argv)
+
+    if args.output.endswith(".csv"):
+        writer = CsvWriter(args.output)
+    elif args.output.endswith(".npz"):
+        writer = NpzWriter(args.output)
+    else:
+        parser.error("Ausgabe muss auf .csv oder .npz enden.")
+
+    failed = 0
+    try:
+        for count, (result, error) in enumerate(
+            iter_results(
+                read_definitions(args.definitions),
+                args.workers,
+                library_path=args.library,
+                precision=args.precision,
+            ),
+            start=1,
+        ):
+            if error is not None:
+                failed += 1
+                print(f"Fehler in Schichtsystem {count}: {error}", file=sys.stderr)
+                continue
+            writer.write(*result)
+    finally:
+        writer.close()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
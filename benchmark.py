@@ -0,0 +1,406 @@
+import argparse
+import copy
+import json
+import os
+import platform
+import sys
+import time
+from datetime import date
+
+import numpy as np
+
+from main import (
+    IncrementalStack,
+    Material,
+    fresnel_coefficients,
+    material_library,
+    optical_gradient,
+    periodic_stack,
+    reflectance,
+    reflectance_adaptive,
+    reflectance_map,
+)
+
+# /////////////////////////
+#   Laufzeitmessungen des Rechenkerns
+#
+#   python benchmark.py                      misst alle Fälle und vergleicht mit der Baseline
+#   python benchmark.py -k layers --save     misst eine Auswahl und schreibt sie in die Baseline
+#   python benchmark.py -k accuracy          prüft nur die Genauigkeit (adaptive Raster)
+#
+#   Jeder Fall wird so oft wiederholt, dass eine Messung mindestens MIN_TIME Sekunden
+#   dauert; gespeichert wird der Median der Laufzeit pro Aufruf. Der Dispersions-Cache
+#   ist dabei warm, gemessen wird also die Transfermatrix-Rechnung selbst. Die
+#   Indexfälle rufen Material.refractive_index direkt und damit ohne Cache auf.
+# ////////////////////////
+DEFAULT_BASELINE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json"
+)
+MIN_TIME = 0.05
+VISIBLE = (4e-7, 8e-7)
+EUV = (12.5e-9, 14.5e-9)
+
+
+def _layer(name, d):
+    """Kopiert ein Material der Bibliothek mit neuer Dicke."""
+    m = copy.copy(material_library[name])
+    m.d = d
+    return m
+
+
+def table_material(interpolation="linear", rows=200):
+    """Erzeugt ein Tabellen-Material (n_type 3) mit glatter Dispersion."""
+    wl = np.linspace(0.3, 1.0, rows)
+    return Material(
+        f"Tabelle ({interpolation})",
+        3,
+        table={
+            "wavelengths": wl.tolist(),
+            "n_values": (1.45 + 0.004 / wl**2).tolist(),
+            "k_values": (1e-4 / wl).tolist(),
+        },
+        interpolation=interpolation,
+    )
+
+
+def alternating_stack(layers):
+    """TiO2/MgF2-Wechselschichtsystem auf BK7 mit leicht verschiedenen Dicken.
+
+    Die Dicken variieren, damit die Periodenerkennung nicht greift und jede Schicht
+    einzeln multipliziert wird.
+    """
+    stack = [_layer("Luft", np.inf)]
+    for i in range(layers):
+        stack.append(_layer("TiO2" if i % 2 == 0 else "MgF2", 60 + 0.37 * i))
+    stack.append(_layer("BK7", np.inf))
+    return stack
+
+
+def mo_si_stack(periods=40):
+    """Mo/Si-Spiegel für 13.5 nm aus den Voreinstellungen von Material.json."""
+    return periodic_stack(
+        _layer("Luft", np.inf),
+        [
+            _layer("Mo", material_library["Mo"].d),
+            _layer("Si", material_library["Si"].d),
+        ],
+        periods,
+        _layer("Si", np.inf),
+    )
+
+
+def fabry_perot_stack(pairs=6, center=550):
+    """Schmalbandfilter (HL)^pairs 2H (LH)^pairs aus TiO2/MgF2 auf BK7."""
+    high, low = material_library["TiO2"], material_library["MgF2"]
+    d_high = center / 4 / high.refractive_index(center * 1e-9).real
+    d_low = center / 4 / low.refractive_index(center * 1e-9).real
+    pair = [_layer("TiO2", d_high), _layer("MgF2", d_low)]
+    return (
+        [_layer("Luft", np.inf)]
+        + pair * pairs
+        + [_layer("TiO2", 2 * d_high)]
+        + pair[::-1] * pairs
+        + [_layer("BK7", np.inf)]
+    )
+
+
+def accuracy_cases():
+    """Liefert Genauigkeitsprüfungen als Dictionary von Name zu parameterlosem Aufruf.
+
+    Jeder Aufruf vergleicht ein adaptiv abgetastetes Spektrum mit einer dichten
+    Referenz und liefert (größter Interpolationsfehler, Toleranz, Stützstellen).
+    """
+
+    def adaptive(stack, polarization, wavelengths, theta, tolerance):
+        sweep = wavelengths if np.size(wavelengths) == 2 else theta
+        x, R = reflectance_adaptive(
+            stack, wavelengths, polarization, theta, tolerance, max_points=10000
+        )
+        dense = np.linspace(*sweep, 200001)
+        if sweep is wavelengths:
+            reference = reflectance(stack, dense, polarization, theta)
+        else:
+            reference = reflectance(stack, wavelengths, polarization, dense)
+        error = float(np.max(np.abs(np.interp(dense, x, R) - reference)))
+        return error, tolerance, x.size
+
+    filter_stack, mirror = fabry_perot_stack(), alternating_stack(40)
+    result = {}
+    for tolerance in (1e-2, 1e-3, 1e-4):
+        result[f"accuracy/filter-{tolerance:g}"] = lambda t=tolerance: adaptive(
+            filter_stack, "Senkrecht", VISIBLE, 0, t
+        )
+        result[f"accuracy/mirror-{tolerance:g}"] = lambda t=tolerance: adaptive(
+            mirror, "Unpolarisiert", VISIBLE, 0.2, t
+        )
+    result["accuracy/filter-angles"] = lambda: adaptive(
+        filter_stack, "Parallel", 5.6e-7, (0, 1.5), 1e-3
+    )
+    result["accuracy/MoSi-40"] = lambda: adaptive(
+        mo_si_stack(), "Senkrecht", EUV, 0, 1e-3
+    )
+    return result
+
+
+def check_accuracy(selection=None, report=print):
+    """Führt die ausgewählten Genauigkeitsprüfungen aus.
+
+    Args:
+        selection (list): Teilzeichenketten der Prüfungsnamen, None für alle.
+        report (callable): Erhält nach jeder Prüfung eine Ergebniszeile.
+
+    Returns:
+        Anzahl der Prüfungen, deren Fehler die Toleranz übersteigt.
+    """
+    failed = 0
+    for name, function in accuracy_cases().items():
+        if selection and not any(s in name for s in selection):
+            continue
+        error, tolerance, points = function()
+        failed += error > tolerance
+        if report is not None:
+            report(
+                f"{name:<24} {error:10.2e} / {tolerance:.0e} bei {points:5d} Punkten"
+                f"{'  ZU UNGENAU' if error > tolerance else ''}"
+            )
+    return failed
+
+
+def cases():
+    """Liefert alle Messfälle als Dictionary von Name zu parameterlosem Aufruf."""
+    wl_visible = np.linspace(*VISIBLE, 1000)
+    wl_euv = np.linspace(*EUV, 1000)
+    result = {}
+
+    index_materials = {
+        "index/0-const": material_library["Mo"],
+        "index/1-sellmeier": material_library["BK7"],
+        "index/2-formula": material_library["TiO2"],
+        "index/3-table-linear": table_material("linear"),
+        "index/3-table-cubic": table_material("cubic"),
+    }
+    wl_dense = np.linspace(*VISIBLE, 100000)
+    for name, material in index_materials.items():
+        result[name] = lambda m=material: m.refractive_index(wl_dense)
+
+    n1, n2 = 1.0, material_library["BK7"].refractive_index(wl_dense)
+    thetas = np.linspace(0, 1.4, wl_dense.size)
+    for polarization in ("Senkrecht", "Parallel"):
+        result[f"fresnel/{polarization}"] = lambda p=polarization: fresnel_coefficients(
+            n1, n2, thetas, p
+        )
+
+    for layers in (2, 10, 50, 200):
+        stack = alternating_stack(layers)
+        result[f"layers/{layers}"] = lambda s=stack: reflectance(
+            s, wl_visible, "Senkrecht", 0
+        )
+
+    stack = alternating_stack(20)
+    for points in (100, 1000, 10000, 100000):
+        wl = np.linspace(*VISIBLE, points)
+        result[f"sweep/{points}"] = lambda w=wl: reflectance(
+            stack, w, "Unpolarisiert", 0.2
+        )
+    result["sweep/100000-single"] = lambda w=wl: reflectance(
+        stack, w, "Unpolarisiert", 0.2, "single"
+    )
+
+    wl_map = np.linspace(*VISIBLE, 200)
+    for count in (10, 100, 1000):
+        angles = np.linspace(0, 1.4, count)
+        result[f"angles/{count}"] = lambda a=angles: reflectance_map(
+            stack, wl_map, "Senkrecht", a
+        )
+
+    mo_si = mo_si_stack()
+    result["preset/MoSi-40"] = lambda: reflectance(mo_si, wl_euv, "Senkrecht", 0)
+    result["preset/MoSi-40-map"] = lambda: reflectance_map(
+        mo_si, np.linspace(*EUV, 200), "Unpolarisiert", np.linspace(0, 0.35, 50)
+    )
+
+    stack30 = alternating_stack(30)
+    result["gradient/30"] = lambda: optical_gradient(
+        stack30, wl_visible, "Senkrecht", 0, indices=False
+    )
+    incremental = IncrementalStack(stack30, wl_visible, "Senkrecht", 0)
+    counter = iter(range(10**9))
+
+    def incremental_update():
+        i = next(counter)
+        incremental.set_thickness(1 + i % 30, 60 + (i % 7))
+        return incremental.reflectance()
+
+    result["incremental/30"] = incremental_update
+    return result
+
+
+def measure(function, repeats: int = 5):
+    """Misst die Laufzeit eines Aufrufs.
+
+    Args:
+        function (callable): Parameterloser Aufruf.
+        repeats (int): Anzahl der Messungen.
+
+    Returns:
+        Dictionary mit Median und Bestwert pro Aufruf in Sekunden sowie der Anzahl
+        der Aufrufe pro Messung.
+    """
+    function()  # Aufwärmen, füllt u.a. den Dispersions-Cache
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_TIME:
+            break
+        number *= max(2, int(MIN_TIME / max(elapsed, 1e-9)))
+    timings = [elapsed / number]
+    for _ in range(repeats - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        timings.append((time.perf_counter() - start) / number)
+    return {
+        "seconds": float(np.median(timings)),
+        "best": float(min(timings)),
+        "number": number,
+        "repeats": repeats,
+    }
+
+
+def run(selection=None, repeats: int = 5, report=print):
+    """Führt die ausgewählten Messfälle aus.
+
+    Args:
+        selection (list): Teilzeichenketten der Fallnamen, None für alle.
+        repeats (int): Anzahl der Messungen pro Fall.
+        report (callable): Erhält nach jedem Fall eine Ergebniszeile.
+
+    Returns:
+        Dictionary im Format der Baseline-Datei.
+    """
+    results = {}
+    for name, function in cases().items():
+        if selection and not any(s in name for s in selection):
+            continue
+        results[name] = measure(function, repeats)
+        if report is not None:
+            report(f"{name:<24} {results[name]['seconds'] * 1e3:10.3f} ms")
+    return {
+        "meta": {
+            "date": date.today().isoformat(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "processor": platform.processor() or platform.machine(),
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, tolerance: float = 0.25):
+    """Vergleicht Messergebnisse mit einer Baseline.
+
+    Args:
+        current (dict): Ergebnis von run.
+        baseline (dict): Inhalt der Baseline-Datei.
+        tolerance (float): Erlaubte relative Verlangsamung, 0.25 entspricht 25 %.
+
+    Returns:
+        Liste von Tupeln (Name, Baseline, aktuell, Verhältnis, Regression) für alle
+        Fälle, die in beiden enthalten sind.
+    """
+    rows = []
+    for name, result in current["results"].items():
+        reference = baseline.get("results", {}).get(name)
+        if reference is None:
+            continue
+        ratio = result["seconds"] / reference["seconds"]
+        rows.append(
+            (
+                name,
+                reference["seconds"],
+                result["seconds"],
+                ratio,
+                ratio > 1 + tolerance,
+            )
+        )
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Misst die Laufzeit des optischen Rechenkerns und erkennt Regressionen."
+    )
+    parser.add_argument(
+        "-k", "--select", action="append", help="Nur Fälle, deren Name dies enthält"
+    )
+    parser.add_argument(
+        "-r", "--repeats", type=int, default=5, help="Messungen pro Fall"
+    )
+    parser.add_argument(
+        "-b", "--baseline", default=DEFAULT_BASELINE, help="Pfad der Baseline-Datei"
+    )
+    parser.add_argument(
+        "--save",
+        action="store_true",
+        help="Ergebnisse in die Baseline übernehmen statt zu vergleichen",
+    )
+    parser.add_argument(
+        "-t",
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Erlaubte relative Verlangsamung (Standard 0.25)",
+    )
+    parser.add_argument(
+        "-o", "--output", help="Ergebnisse zusätzlich als JSON speichern"
+    )
+    args = parser.parse_args(argv)
+
+    inaccurate = 0
+    if not args.save:
+        inaccurate = check_accuracy(args.select)
+        if inaccurate:
+            print(f"{inaccurate} Prüfungen ungenauer als erlaubt.", file=sys.stderr)
+    current = run(args.select, args.repeats)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(current, file, indent=2)
+
+    if args.save:
+        baseline = {"results": {}}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, "r") as file:
+                baseline = json.load(file)
+        # Nur die gemessenen Fälle ersetzen, damit Teilläufe die Baseline ergänzen
+        baseline["meta"] = current["meta"]
+        baseline["results"].update(current["results"])
+        with open(args.baseline, "w") as file:
+            json.dump(baseline, file, indent=2, sort_keys=True)
+        print(f"Baseline gespeichert: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"Keine Baseline gefunden: {args.baseline}", file=sys.stderr)
+        return 1 if inaccurate else 0
+    with open(args.baseline, "r") as file:
+        baseline = json.load(file)
+    rows = compare(current, baseline, args.tolerance)
+    print()
+    print(f"{'Fall':<24} {'Baseline':>12} {'Aktuell':>12} {'Faktor':>8}")
+    for name, reference, seconds, ratio, regression in rows:
+        print(
+            f"{name:<24} {reference * 1e3:10.3f} ms {seconds * 1e3:10.3f} ms "
+            f"{ratio:8.2f}{'  REGRESSION' if regression else ''}"
+        )
+    regressions = sum(row[4] for row in rows)
+    if regressions:
+        print(f"{regressions} Fälle langsamer als erlaubt.", file=sys.stderr)
+    return 1 if regressions or inaccurate else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
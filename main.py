@@ -1,5 +1,168 @@
 import numpy as np
+import ast
+import contextlib
 import json
+import os
+import hashlib
+import threading
+import time
+import warnings
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from collections import OrderedDict
+
+# Erlaubte Namen in benutzerdefinierten Formeln (n_type 2), x ist die Wellenlänge in µm:
+# alle NumPy-Ufuncs (sqrt, exp, arcsinh, ...) sowie einige Konstanten und Funktionen
+FORMULA_NAMESPACE = {
+    name: value
+    for name, value in vars(np).items()
+    if isinstance(value, np.ufunc) and not name.startswith("_")
+}
+FORMULA_NAMESPACE.update(
+    {
+        name: getattr(np, name)
+        for name in ("pi", "e", "inf", "euler_gamma", "real", "imag", "where")
+    }
+)
+_FORMULA_GLOBALS = {**FORMULA_NAMESPACE, "__builtins__": {}}
+# Erlaubte Syntax: Arithmetik, Vergleiche, bedingte Ausdrücke, Indizierung und Aufrufe
+# von Funktionen aus FORMULA_NAMESPACE; Attribute, Lambdas und Comprehensions fehlen
+# bewusst, da über sie beliebiger Code erreichbar wäre
+_FORMULA_NODES = (
+    ast.Expression,
+    ast.BinOp,
+    ast.UnaryOp,
+    ast.Compare,
+    ast.IfExp,
+    ast.Call,
+    ast.Name,
+    ast.Constant,
+    ast.Subscript,
+    ast.Slice,
+    ast.Tuple,
+    ast.Load,
+    ast.operator,
+    ast.unaryop,
+    ast.cmpop,
+)
+
+
+class DispersionTable:
+    """Vorverarbeitete Messtabelle für die Interpolation des Brechungsindex (n_type 3).
+
+    Die Tabelle wird einmalig sortiert, von doppelten Stützstellen befreit und als
+    zusammenhängende Float-Arrays abgelegt. Bei äquidistanten Stützstellen wird das
+    Intervall eines Punktes direkt berechnet, sonst per binärer Suche gefunden.
+
+    Attributes:
+        wavelengths (np.ndarray): Sortierte Stützstellen in µm.
+        values (np.ndarray): Komplexe Brechungsindizes n + ik an den Stützstellen.
+        method (str): "linear" oder "cubic" (monotone kubische Hermite-Interpolation, PCHIP).
+        key (bytes): Hash der Tabellendaten für den Dispersions-Cache.
+    """
+
+    METHODS = ("linear", "cubic")
+
+    def __init__(self, wavelengths, n_values, k_values, method: str = "linear"):
+        if method not in self.METHODS:
+            raise ValueError(f"Unbekannte Interpolationsmethode: {method}")
+        wl = np.asarray(wavelengths, dtype=float)
+        values = np.asarray(n_values, dtype=float) + 1j * np.asarray(
+            k_values, dtype=float
+        )
+        wl, first = np.unique(wl, return_index=True)
+        self.wavelengths = np.ascontiguousarray(wl)
+        self.values = np.ascontiguousarray(values[first])
+        self.method = method
+
+        step = np.diff(self.wavelengths)
+        self._step = (
+            step[0]
+            if step.size and np.allclose(step, step[0], rtol=1e-9, atol=0)
+            else None
+        )
+        self._slopes = None
+        if method == "cubic" and self.wavelengths.size > 2:
+            self._slopes = self._pchip_slopes(
+                self.wavelengths, self.values.real
+            ) + 1j * self._pchip_slopes(self.wavelengths, self.values.imag)
+
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(self.wavelengths.tobytes())
+        digest.update(self.values.tobytes())
+        digest.update(method.encode())
+        self.key = digest.digest()
+
+    @staticmethod
+    def _pchip_slopes(x, y):
+        """Berechnet die Ableitungen der formerhaltenden Hermite-Interpolation nach Fritsch-Carlson.
+
+        Args:
+            x (np.ndarray): Streng monotone Stützstellen.
+            y (np.ndarray): Reelle Werte an den Stützstellen.
+
+        Returns:
+            Ableitungen an allen Stützstellen.
+        """
+        h = np.diff(x)
+        delta = np.diff(y) / h
+        slopes = np.zeros_like(y)
+
+        w1 = 2 * h[1:] + h[:-1]
+        w2 = h[1:] + 2 * h[:-1]
+        same_sign = np.sign(delta[:-1]) * np.sign(delta[1:]) > 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            harmonic = (w1 + w2) / (w1 / delta[:-1] + w2 / delta[1:])
+        slopes[1:-1] = np.where(same_sign, harmonic, 0.0)
+
+        def edge(h0, h1, d0, d1):
+            d = ((2 * h0 + h1) * d0 - h0 * d1) / (h0 + h1)
+            if np.sign(d) != np.sign(d0):
+                return 0.0
+            if np.sign(d0) != np.sign(d1) and abs(d) > abs(3 * d0):
+                return 3 * d0
+            return d
+
+        slopes[0] = edge(h[0], h[1], delta[0], delta[1])
+        slopes[-1] = edge(h[-1], h[-2], delta[-1], delta[-2])
+        return slopes
+
+    def index(self, x):
+        """Bestimmt für jeden Punkt das Intervall der Tabelle, in dem er liegt.
+
+        Args:
+            x (np.ndarray): Wellenlängen in µm.
+
+        Returns:
+            Intervallindizes zwischen 0 und Anzahl der Stützstellen - 2.
+        """
+        if self._step is not None:
+            i = np.floor((x - self.wavelengths[0]) / self._step).astype(np.intp)
+        else:
+            i = np.searchsorted(self.wavelengths, x, side="right") - 1
+        return np.clip(i, 0, self.wavelengths.size - 2)
+
+    def __call__(self, x):
+        """Interpoliert den komplexen Brechungsindex, außerhalb der Tabelle wird der Randwert gehalten.
+
+        Args:
+            x (float | np.ndarray): Wellenlängen in µm.
+
+        Returns:
+            Komplexe Brechungsindizes an den Stellen x.
+        """
+        if self._slopes is None:
+            return np.interp(x, self.wavelengths, self.values)
+        x = np.clip(x, self.wavelengths[0], self.wavelengths[-1])
+        i = self.index(x)
+        h = self.wavelengths[i + 1] - self.wavelengths[i]
+        t = (x - self.wavelengths[i]) / h
+        t2, t3 = t * t, t * t * t
+        return (
+            (2 * t3 - 3 * t2 + 1) * self.values[i]
+            + (t3 - 2 * t2 + t) * h * self._slopes[i]
+            + (-2 * t3 + 3 * t2) * self.values[i + 1]
+            + (t3 - t2) * h * self._slopes[i + 1]
+        )
 
 
 # /////////////////////////
@@ -19,8 +182,10 @@ class Material:
         B (float): Optionaler B-Koeffizient der Sellmeier-Gleichung.
         C (float): Optionaler C-Koeffizient der Sellmeier-Gleichung.
         n (complex): Optionale Komplexe Brechzahl, falls sich für einen fixen Wert entschieden wird.
-        formula (string): Optionale Benutzerdefinierte Formel zur Bestimmung des Brechungsindex.
+        formula (string): Optionale Benutzerdefinierte Formel zur Bestimmung des Brechungsindex, wird beim Erstellen kompiliert.
         table (dict): Optionale Messdaten für Ermittlung des Brechungsindex durch Interpolation
+        interpolation (str): Interpolationsart der Messdaten, "linear" oder "cubic".
+        incoherent (bool): Ob die Schicht inkohärent gerechnet wird (dicke Substrate, Kittschichten).
     """
 
     def refractive_index(self, wavelength):
@@ -38,31 +203,22 @@ class Material:
         Returns:
             Liefert den Brechungsindex zurück.
         """
-        wavelength = wavelength * 1e6
-        if self.n_type == 0:
-            return self.n
-        elif self.n_type == 1:
-            n = 0
-            wl = wavelength**2
-            for i in range(0, len(self.B)):
-                n += (self.B[i] * wl) / (wl - self.C[i])
-            return np.sqrt(1 + self.A + n)
-        elif self.n_type == 2:
-            global_vars = {**np.__dict__}
-            local_var = {"x": wavelength}
-            return eval(self.formula.strip(), global_vars, local_var)
-        elif self.n_type == 3:
-            if not self.table or "wavelengths" not in self.table:
-                return 1.0 + 0j
-            wl = np.array(self.table["wavelengths"])
-            n = np.array(self.table["n_values"])
-            k = np.array(self.table["k_values"])
-
-            n_interp = np.interp(wavelength, wl, n, left=n[0], right=n[-1])
-            k_interp = np.interp(wavelength, wl, k, left=k[0], right=k[-1])
-            return n_interp + 1j * k_interp
-        else:
-            return self.n
+        instrumentation.count("index_evaluations")
+        instrumentation.count("index_points", np.size(wavelength))
+        with instrumentation.stage("refractive_index"):
+            wavelength = wavelength * 1e6
+            if self.n_type == 0:
+                return self.n
+            elif self.n_type == 1:
+                return self.sellmeier(wavelength**2)
+            elif self.n_type == 2:
+                return eval(self._formula_code, _FORMULA_GLOBALS, {"x": wavelength})
+            elif self.n_type == 3:
+                if self._table is None:
+                    return 1.0 + 0j
+                return self._table(wavelength)
+            else:
+                return self.n
 
     def __init__(
         self,
@@ -75,6 +231,8 @@ class Material:
         n: complex = 0,
         formula: str = "",
         table: dict = {},
+        interpolation: str = "linear",
+        incoherent: bool = False,
     ):
         self.name = name
         self.d = d
@@ -85,6 +243,105 @@ class Material:
         self.C = C
         self.formula = formula
         self.table = table
+        self.interpolation = interpolation
+        self.incoherent = incoherent
+        self._sellmeier_B = np.asarray(B or (), dtype=float)
+        self._sellmeier_C = np.asarray(C or (), dtype=float)
+        self._formula_code = (
+            self.compile_formula(formula, name) if n_type == 2 else None
+        )
+        self._table = (
+            DispersionTable(
+                table["wavelengths"],
+                table["n_values"],
+                table["k_values"],
+                interpolation,
+            )
+            if n_type == 3 and table and "wavelengths" in table
+            else None
+        )
+
+    def sellmeier(self, wavelength_squared):
+        """Wertet die Sellmeier-Gleichung für alle Terme in einer Broadcast-Operation aus.
+
+        Args:
+            wavelength_squared (float | np.ndarray): Quadrat der Wellenlängen in µm².
+
+        Returns:
+            Brechungsindizes an allen Wellenlängen.
+        """
+        wl2 = np.asarray(wavelength_squared, dtype=float)[..., np.newaxis]
+        terms = self._sellmeier_B * wl2 / (wl2 - self._sellmeier_C)
+        return np.sqrt(1 + self.A + terms.sum(axis=-1))
+
+    @staticmethod
+    def compile_formula(formula: str, name: str = ""):
+        """Übersetzt eine benutzerdefinierte Formel einmalig in ausführbaren Code.
+
+        Die Formel wird mit x als Wellenlänge in µm über ganze Arrays ausgewertet. Vor
+        dem Übersetzen wird der gesamte Syntaxbaum geprüft: Erlaubt sind nur die
+        Knoten aus _FORMULA_NODES, Zahlenkonstanten, x und Namen aus FORMULA_NAMESPACE,
+        aufgerufen werden dürfen nur diese Funktionen und ohne Schlüsselwortargumente.
+
+        Args:
+            formula (str): Formel des Brechungsindex in Abhängigkeit von x.
+            name (str): Name des Materials für Fehlermeldungen.
+
+        Raises:
+            SyntaxError: Falls die Formel kein gültiger oder ein nicht erlaubter
+                Ausdruck ist (Attribute, Lambdas, Comprehensions, ...).
+            NameError: Falls die Formel unbekannte Namen verwendet.
+
+        Returns:
+            Kompiliertes Code-Objekt der Formel.
+        """
+        file_name = f"<Formel {name}>"
+        tree = ast.parse(formula.strip(), file_name, "eval")
+        unknown = set()
+        for node in ast.walk(tree):
+            if not isinstance(node, _FORMULA_NODES):
+                raise SyntaxError(
+                    f"Nicht erlaubter Ausdruck in Formel von {name}: "
+                    f"{type(node).__name__}"
+                )
+            if isinstance(node, ast.Constant) and not isinstance(
+                node.value, (int, float, complex)
+            ):
+                raise SyntaxError(f"Nur Zahlen als Konstanten in Formel von {name}")
+            if isinstance(node, ast.Call) and (
+                not isinstance(node.func, ast.Name) or node.keywords
+            ):
+                raise SyntaxError(
+                    f"Nur direkte Funktionsaufrufe ohne Schlüsselwörter in Formel von {name}"
+                )
+            if isinstance(node, ast.Name) and node.id != "x":
+                if node.id not in FORMULA_NAMESPACE:
+                    unknown.add(node.id)
+        if unknown:
+            raise NameError(
+                f"Unbekannte Namen in Formel von {name}: {', '.join(sorted(unknown))}"
+            )
+        return compile(tree, file_name, "eval")
+
+    def __getstate__(self):
+        """Entfernt den kompilierten Formel-Code, der sich nicht pickeln lässt.
+
+        Returns:
+            Zustand des Objekts für pickle und copy.
+        """
+        state = self.__dict__.copy()
+        state["_formula_code"] = None
+        return state
+
+    def __setstate__(self, state):
+        """Stellt den Zustand wieder her und kompiliert die Formel erneut.
+
+        Args:
+            state (dict): Zustand aus __getstate__.
+        """
+        self.__dict__.update(state)
+        if self.n_type == 2:
+            self._formula_code = self.compile_formula(self.formula, self.name)
 
     def __str__(self):
         """To-String Methode für Ausgabe von Material-Objekten.
@@ -94,6 +351,26 @@ class Material:
         """
         return self.name
 
+    def dispersion_key(self):
+        """Bildet einen Schlüssel aus allen Parametern, die den Brechungsindex bestimmen.
+
+        Die Dicke gehört nicht dazu, damit Kopien eines Materials mit anderer Dicke
+        dieselben Cache-Einträge nutzen.
+
+        Returns:
+            Hashbares Tupel der Dispersionsparameter.
+        """
+        table = self._table.key if self._table is not None else None
+        return (
+            self.n_type,
+            self.A,
+            tuple(self.B or ()),
+            tuple(self.C or ()),
+            complex(self.n),
+            self.formula,
+            table,
+        )
+
     def toJson(self):
         """Nimmt alle Parameter des Material-Objekts und formt sie in ein Dictionary.
 
@@ -109,37 +386,640 @@ class Material:
             "C": self.C,
             "n": str(self.n),
             "formula": self.formula,
-            "table": self.table,
+            "table": {
+                key: (
+                    np.asarray(values).tolist()
+                    if isinstance(values, np.ndarray)
+                    else values
+                )
+                for key, values in (self.table or {}).items()
+            },
+            "interpolation": self.interpolation,
+            "incoherent": self.incoherent,
         }
 
     @staticmethod
-    def toMaterial():
-        """Liest eine lokale Material.json ein und wandelt alle Daten in die Form eines Material-Objekts um.
-
-        Returns:
-            Material-Liste mit allen Objekten aus der Material.json im Root.
-
-        """
-        with open("Material.json", "r") as file:
-            data = json.load(file)
-            material_list = [
-                Material(
-                    name=i["name"],
-                    d=i["d"],
-                    n_type=i["n_type"],
-                    A=i["A"],
-                    B=i["B"],
-                    C=i["C"],
-                    n=complex(i["n"]),
-                    formula=i["formula"],
-                    table=i["table"],
-                )
-                for i in data
-            ]
-            return material_list
+    def fromJson(data: dict):
+        """Erzeugt ein Material-Objekt aus einem Dictionary in der Form von toJson.
+
+        Args:
+            data (dict): Parameter des Materials.
+
+        Returns:
+            Material-Objekt.
+        """
+        return Material(
+            name=data["name"],
+            d=data["d"],
+            n_type=data["n_type"],
+            A=data["A"],
+            B=data["B"],
+            C=data["C"],
+            n=complex(data["n"]),
+            formula=data["formula"],
+            table=data["table"],
+            interpolation=data.get("interpolation", "linear"),
+            incoherent=data.get("incoherent", False),
+        )
+
+    @staticmethod
+    def toMaterial(path: str = None):
+        """Liest eine Material.json ein und wandelt alle Daten in die Form eines Material-Objekts um.
+
+        Args:
+            path (str): Pfad zur Materialdatei, standardmäßig die der globalen Bibliothek.
+
+        Returns:
+            Material-Liste mit allen Objekten aus der Materialdatei.
+
+        """
+        return list(MaterialLibrary(path or material_library.path))
+
+
+class MaterialLibrary:
+    """Materialbibliothek, die erst beim ersten Zugriff geladen wird.
+
+    Die Datei wird beim ersten Zugriff gelesen, einzelne Einträge werden aber erst
+    in Material-Objekte umgewandelt (Formel kompilieren, Tabelle aufbereiten), wenn
+    sie benötigt werden. Materialdatei und Journal werden zusammengeführt in einer
+    kompakten JSON-Cache-Datei neben der Materialdatei abgelegt, die weitere Prozesse
+    ohne erneutes Abspielen des Journals laden, solange sich beides nicht ändert. Der
+    Cache enthält nur Daten, keinen ausführbaren Inhalt; ist er unlesbar, veraltet
+    oder ungültig, wird er einfach neu erzeugt.
+
+    Neue oder geänderte Materialien werden nicht durch Neuschreiben der ganzen Datei
+    gespeichert, sondern als einzelne JSON-Zeile an ein Journal (<Materialdatei>.journal)
+    angehängt, das beim Laden über die Materialdatei gelegt wird. compact() führt
+    beides wieder in der Materialdatei zusammen; save() tut das selbst, sobald das
+    Journal JOURNAL_COMPACT_BYTES überschreitet. Große Messtabellen landen als .npy
+    im Verzeichnis <Materialdatei>_tables und werden beim Laden per Memory-Map eingebunden.
+
+    Attributes:
+        path (str): Pfad zur Materialdatei.
+        errors (dict): Name zu Fehlermeldung aller Einträge, die sich beim Durchlaufen
+            nicht in Material-Objekte umwandeln ließen.
+    """
+
+    TABLE_FILE_ROWS = 1000
+    JOURNAL_COMPACT_BYTES = 2**20
+
+    def __init__(self, path: str):
+        self.path = path
+        self.journal_path = path + ".journal"
+        self.table_dir = os.path.splitext(path)[0] + "_tables"
+        self._entries = None
+        self._materials = {}
+        self._pending = []
+        self.errors = {}
+
+    def _signature(self):
+        """Bildet aus Änderungszeit und Größe von Materialdatei und Journal eine Signatur."""
+        signature = []
+        for path in (self.path, self.journal_path):
+            try:
+                stat = os.stat(path)
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+
+    def _load(self):
+        """Liest Materialdatei und Journal bzw. deren Cache, falls noch nicht geschehen."""
+        if self._entries is not None:
+            return
+        signature = self._signature()
+        cache_path = self.path + ".cache"
+        try:
+            with open(cache_path, "r") as file:
+                cache = json.load(file)
+            entries = cache["entries"]
+            if cache["signature"] != [
+                None if s is None else list(s) for s in signature
+            ]:
+                raise ValueError("Cache veraltet")
+            if not all(entry["name"] == name for name, entry in entries.items()):
+                raise ValueError("Cache ungültig")
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            with open(self.path, "r") as file:
+                entries = {i["name"]: i for i in json.load(file)}
+            if signature[1] is not None:
+                with open(self.journal_path, "r") as file:
+                    for line in file:
+                        if not line.strip():
+                            continue
+                        entry = json.loads(line)
+                        if entry.get("deleted"):
+                            entries.pop(entry["name"], None)
+                        else:
+                            entries[entry["name"]] = entry
+            # Über eine temporäre Datei, damit parallel ladende Worker nie einen halb
+            # geschriebenen Cache sehen
+            temp_path = f"{cache_path}.{os.getpid()}.tmp"
+            try:
+                with open(temp_path, "w") as file:
+                    json.dump({"signature": signature, "entries": entries}, file)
+                os.replace(temp_path, cache_path)
+            except OSError:
+                pass  # ohne Schreibrechte wird nur auf den Cache verzichtet
+        self._entries = entries
+
+    def names(self):
+        """Liefert die Namen aller Materialien in Dateireihenfolge.
+
+        Returns:
+            Liste von Materialnamen.
+        """
+        self._load()
+        return list(self._entries)
+
+    def __getitem__(self, name: str):
+        """Liefert ein Material und wandelt dessen Eintrag beim ersten Zugriff um.
+
+        Args:
+            name (str): Name des Materials.
+
+        Returns:
+            Material-Objekt.
+        """
+        material = self._materials.get(name)
+        if material is None:
+            self._load()
+            entry = self._entries[name]
+            if "file" in (entry["table"] or {}):
+                entry = {**entry, "table": self._read_table(entry["table"]["file"])}
+            material = Material.fromJson(entry)
+            self._materials[name] = material
+        return material
+
+    def __contains__(self, name: str):
+        self._load()
+        return name in self._entries
+
+    def __iter__(self):
+        """Durchläuft alle Materialien; fehlerhafte Einträge werden übersprungen.
+
+        Ein Eintrag, dessen Formel oder Tabelle sich nicht laden lässt, soll nicht die
+        ganze Bibliothek unbrauchbar machen. Er wird mit einer Warnung übergangen und
+        in errors vermerkt, ein direkter Zugriff mit library[name] meldet den Fehler.
+
+        Yields:
+            Material-Objekte in Dateireihenfolge.
+        """
+        for name in self.names():
+            try:
+                material = self[name]
+            except (
+                SyntaxError,
+                NameError,
+                ValueError,
+                TypeError,
+                KeyError,
+                OSError,
+            ) as e:
+                if name not in self.errors:
+                    warnings.warn(f"Material {name} wird übersprungen: {e}")
+                self.errors[name] = str(e)
+                continue
+            self.errors.pop(name, None)
+            yield material
+
+    def __len__(self):
+        self._load()
+        return len(self._entries)
+
+    def add(self, material: Material):
+        """Fügt ein Material hinzu oder ersetzt ein gleichnamiges; gespeichert wird mit save().
+
+        Args:
+            material (Material): Neues Material.
+        """
+        self._load()
+        self._entries[material.name] = self._serialize(material)
+        self._materials[material.name] = material
+        self._pending.append(self._entries[material.name])
+
+    def remove(self, name: str):
+        """Entfernt ein Material; gespeichert wird mit save().
+
+        Args:
+            name (str): Name des Materials.
+        """
+        self._load()
+        del self._entries[name]
+        self._materials.pop(name, None)
+        self._pending.append({"name": name, "deleted": True})
+
+    def save(self):
+        """Hängt alle seit dem letzten Speichern geänderten Einträge an das Journal an.
+
+        Wird das Journal größer als JOURNAL_COMPACT_BYTES, wird es mit compact() in
+        die Materialdatei übernommen, damit es nicht bei jedem Laden weiter wächst.
+        """
+        if not self._pending:
+            return
+        with open(self.journal_path, "a") as file:
+            for entry in self._pending:
+                file.write(json.dumps(entry) + "\n")
+        self._pending = []
+        if os.path.getsize(self.journal_path) > self.JOURNAL_COMPACT_BYTES:
+            self.compact()
+
+    def compact(self):
+        """Schreibt die gesamte Bibliothek in die Materialdatei und leert das Journal.
+
+        Nicht mehr referenzierte Tabellendateien werden dabei gelöscht.
+        """
+        self._load()
+        self._pending = []
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w") as file:
+            json.dump(list(self._entries.values()), file, indent=4)
+        os.replace(temp_path, self.path)
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+        if os.path.isdir(self.table_dir):
+            used = {
+                os.path.basename(entry["table"]["file"])
+                for entry in self._entries.values()
+                if "file" in (entry["table"] or {})
+            }
+            for file_name in os.listdir(self.table_dir):
+                if file_name.endswith(".npy") and file_name not in used:
+                    try:
+                        os.remove(os.path.join(self.table_dir, file_name))
+                    except OSError:
+                        pass  # noch als Memory-Map geöffnet (Windows), später erneut
+
+    def _serialize(self, material: Material):
+        """Wandelt ein Material in einen Bibliothekseintrag um und lagert große Tabellen aus.
+
+        Args:
+            material (Material): Zu speicherndes Material.
+
+        Returns:
+            JSON-fähiges Dictionary.
+        """
+        entry = material.toJson()
+        table = material.table or {}
+        if "wavelengths" not in table:
+            return entry
+        data = np.array(
+            [table["wavelengths"], table["n_values"], table["k_values"]], dtype=float
+        )
+        if data.shape[1] >= self.TABLE_FILE_ROWS:
+            entry["table"] = {"file": self._write_table(material.name, data)}
+        else:
+            entry["table"] = {
+                key: values.tolist()
+                for key, values in zip(("wavelengths", "n_values", "k_values"), data)
+            }
+        return entry
+
+    def _write_table(self, name: str, data):
+        """Speichert eine Messtabelle als .npy; der Dateiname enthält einen Hash des Inhalts.
+
+        Eine bereits vorhandene Datei gleichen Namens hat denselben Inhalt und wird
+        nicht angefasst, da sie in diesem oder einem anderen Prozess als Memory-Map
+        geöffnet sein kann. Neue Dateien werden über eine temporäre Datei und
+        os.replace geschrieben, sodass nie eine halb geschriebene Tabelle sichtbar ist.
+
+        Args:
+            name (str): Name des Materials.
+            data (np.ndarray): Array der Form (3, Anzahl Zeilen) mit Wellenlängen, n und k.
+
+        Returns:
+            Pfad der Datei relativ zur Materialdatei.
+        """
+        digest = hashlib.blake2b(data.tobytes(), digest_size=8).hexdigest()
+        safe_name = "".join(c if c.isalnum() else "_" for c in name)
+        file_name = f"{safe_name}-{digest}.npy"
+        relative = os.path.join(os.path.basename(self.table_dir), file_name)
+        path = os.path.join(self.table_dir, file_name)
+        if os.path.exists(path):
+            return relative
+        os.makedirs(self.table_dir, exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as file:
+            np.save(file, data)
+        os.replace(temp_path, path)
+        return relative
+
+    def _read_table(self, file_name: str):
+        """Bindet eine ausgelagerte Messtabelle per Memory-Map ein.
+
+        Args:
+            file_name (str): Pfad relativ zur Materialdatei.
+
+        Returns:
+            Tabellen-Dictionary mit schreibgeschützten Arrays.
+        """
+        path = os.path.join(os.path.dirname(os.path.abspath(self.path)), file_name)
+        data = np.load(path, mmap_mode="r")
+        return {"wavelengths": data[0], "n_values": data[1], "k_values": data[2]}
+
+
+class LRUCache:
+    """Begrenzter, threadsicherer LRU-Cache für berechnete Arrays.
+
+    Attributes:
+        max_entries (int): Maximale Anzahl an Einträgen.
+        max_bytes (int): Maximaler Speicherbedarf aller Einträge in Byte.
+        hits (int): Anzahl der Treffer.
+        misses (int): Anzahl der Fehlzugriffe.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 256 * 2**20):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key):
+        """Liefert den Eintrag zu key und markiert ihn als zuletzt benutzt.
+
+        Args:
+            key: Hashbarer Schlüssel.
+
+        Returns:
+            Gespeicherter Wert oder None, falls der Schlüssel fehlt.
+        """
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """Speichert einen Wert und verdrängt die ältesten Einträge bei Überschreitung der Grenzen.
+
+        Args:
+            key: Hashbarer Schlüssel.
+            value (np.ndarray): Zu speichernder Wert.
+        """
+        with self._lock:
+            if key in self._data:
+                self.nbytes -= self._data.pop(key).nbytes
+            self._data[key] = value
+            self.nbytes += value.nbytes
+            while self._data and (
+                len(self._data) > self.max_entries or self.nbytes > self.max_bytes
+            ):
+                self.nbytes -= self._data.popitem(last=False)[1].nbytes
+
+    def clear(self):
+        """Leert den Cache und setzt die Statistik zurück."""
+        with self._lock:
+            self._data.clear()
+            self.nbytes = self.hits = self.misses = 0
+
+    def stats(self):
+        """Liefert Füllstand und Trefferstatistik.
+
+        Returns:
+            Dictionary mit entries, bytes, max_bytes, hits, misses und hit_rate.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "bytes": self.nbytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+dispersion_cache = LRUCache()
+
+
+# Bezeichnungen der gemessenen Abschnitte für die Zusammenfassung
+STAGES = {
+    "refractive_index": "Brechungsindex",
+    "fresnel": "Fresnel",
+    "matrices": "Matrizen",
+    "products": "Produkte",
+}
+
+
+class _Stage:
+    """Misst die Dauer eines with-Blocks und bucht sie auf einen Abschnitt."""
+
+    __slots__ = ("_owner", "_name", "_start")
+
+    def __init__(self, owner, name):
+        self._owner = owner
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self._owner.add_time(self._name, time.perf_counter() - self._start)
+
+
+_NO_STAGE = contextlib.nullcontext()
+
+
+class Instrumentation:
+    """Optionale Laufzeit- und Zählerstatistik des Rechenkerns.
+
+    Gemessen werden die Abschnitte aus STAGES; verschachtelte Abschnitte sind in den
+    äußeren enthalten (Fresnel-Koeffizienten werden z.B. beim Aufbau der Matrizen
+    berechnet). Zusätzlich werden Rasterpunkte, Grenzflächen, Indexauswertungen und
+    Treffer des dispersion_cache gezählt. Ausgeschaltet kostet jeder Messpunkt nur einen
+    Methodenaufruf. Erfasst wird nur der aktuelle Prozess, Prozess-Pools nicht.
+
+    Attributes:
+        enabled (bool): Ob gemessen wird.
+        timers (dict): Abschnitt zu [Sekunden, Aufrufe].
+        counters (dict): Zählername zu Wert.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.timers = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def enable(self):
+        """Schaltet die Messung ein."""
+        self.enabled = True
+
+    def disable(self):
+        """Schaltet die Messung aus, die bisherigen Werte bleiben erhalten."""
+        self.enabled = False
+
+    def reset(self):
+        """Setzt alle Zeiten und Zähler zurück."""
+        with self._lock:
+            self.timers = {}
+            self.counters = {}
+
+    @contextlib.contextmanager
+    def recording(self):
+        """Misst den with-Block mit frischer Statistik und stellt danach den alten Zustand her.
+
+        Beispiel::
+
+            with instrumentation.recording() as stats:
+                reflectance(material_list, wavelengths, "Senkrecht", 0)
+            print(stats.to_json())
+        """
+        enabled = self.enabled
+        self.reset()
+        self.enabled = True
+        try:
+            yield self
+        finally:
+            self.enabled = enabled
+
+    def stage(self, name: str):
+        """Liefert einen Kontextmanager, der die Dauer des Blocks auf name bucht."""
+        if not self.enabled:
+            return _NO_STAGE
+        return _Stage(self, name)
+
+    def add_time(self, name: str, seconds: float):
+        """Bucht eine gemessene Dauer auf einen Abschnitt."""
+        with self._lock:
+            timer = self.timers.setdefault(name, [0.0, 0])
+            timer[0] += seconds
+            timer[1] += 1
+
+    def count(self, name: str, amount: int = 1):
+        """Erhöht einen Zähler, falls die Messung eingeschaltet ist."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + int(amount)
+
+    def snapshot(self):
+        """Liefert die aktuelle Statistik als Dictionary.
+
+        Returns:
+            Dictionary mit "timers" (Abschnitt zu {"seconds", "calls"}) und "counters".
+        """
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "timers": {
+                    name: {"seconds": seconds, "calls": calls}
+                    for name, (seconds, calls) in self.timers.items()
+                },
+                "counters": dict(self.counters),
+            }
+
+    def to_json(self, indent: int = 2):
+        """Liefert die Statistik als JSON-Text."""
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def dump(self, path: str):
+        """Schreibt die Statistik als JSON-Datei.
+
+        Args:
+            path (str): Zielpfad.
+        """
+        with open(path, "w") as file:
+            file.write(self.to_json())
+
+    def summary(self):
+        """Fasst die Statistik in einer Zeile zusammen, z.B. für eine Statusleiste."""
+        snapshot = self.snapshot()
+        parts = [
+            f"{label} {snapshot['timers'][name]['seconds'] * 1e3:.1f} ms"
+            for name, label in STAGES.items()
+            if name in snapshot["timers"]
+        ]
+        counters = snapshot["counters"]
+        parts.append(
+            f"{counters.get('points', 0)} Punkte, "
+            f"{counters.get('layers', 0)} Grenzflächen, "
+            f"{counters.get('index_evaluations', 0)} Indexauswertungen, "
+            f"Cache {counters.get('cache_hits', 0)}/"
+            f"{counters.get('cache_hits', 0) + counters.get('cache_misses', 0)} Treffer"
+        )
+        return " | ".join(parts)
+
+
+instrumentation = Instrumentation()
+
+
+def _grid_key(wavelengths):
+    """Bildet einen kompakten Schlüssel für ein Wellenlängenraster.
+
+    Args:
+        wavelengths (np.ndarray): Wellenlängen in Meter.
+
+    Returns:
+        Tupel aus Form und Hash der Rasterwerte.
+    """
+    digest = hashlib.blake2b(wavelengths.tobytes(), digest_size=16).digest()
+    return wavelengths.shape, digest
+
+
+def layer_indices(material_list, wavelengths):
+    """Berechnet die Brechungsindizes aller Schichten über das gesamte Wellenlängenraster.
+
+    Jedes Material wird pro Raster genau einmal ausgewertet; das Ergebnis landet im
+    dispersion_cache und wird von weiteren Aufrufen (z.B. mit anderer Polarisation)
+    wiederverwendet.
+
+    Args:
+        material_list (list): Liste an Material-Objekten.
+        wavelengths (np.ndarray): Wellenlängen in Meter.
+
+    Returns:
+        Liste mit einem schreibgeschützten Array von Brechungsindizes pro Schicht.
+    """
+    wls = np.ascontiguousarray(wavelengths, dtype=float)
+    grid = _grid_key(wls)
+    wl_squared = None
+    indices = []
+    for material in material_list:
+        key = (material.dispersion_key(), grid)
+        n = dispersion_cache.get(key)
+        instrumentation.count("cache_misses" if n is None else "cache_hits")
+        if n is None:
+            if material.n_type == 1:
+                # λ² in µm² wird von allen Sellmeier-Schichten des Rasters geteilt
+                instrumentation.count("index_evaluations")
+                instrumentation.count("index_points", wls.size)
+                with instrumentation.stage("refractive_index"):
+                    if wl_squared is None:
+                        wl_squared = (wls * 1e6) ** 2
+                    n = np.array(material.sellmeier(wl_squared))
+            else:
+                n = np.array(material.refractive_index(wls))
+            n.setflags(write=False)
+            dispersion_cache.put(key, n)
+        indices.append(n)
+    return indices
 
 
 # Fresnel-Formeln & Transfermatrix
+POLARIZATIONS = ("Senkrecht", "Parallel")
+
+# Rechengenauigkeit der Transfermatrizen; "single" halbiert Speicher und Bandbreite
+PRECISIONS = {"double": np.complex128, "single": np.complex64}
+# Stichproben und erlaubte Abweichung von R und T bei der Kontrolle gegen "double"
+PRECISION_SAMPLES = 64
+PRECISION_TOLERANCE = 1e-4
+
+
+class PrecisionWarning(UserWarning):
+    """Die reduzierte Genauigkeit weicht auf den Stichproben zu stark von "double" ab."""
+
+
 def fresnel_coefficients(n1, n2, theta1, polarization):
     """Berechnet Fresnel-Koeffizienten (Reflexion & Transmission)
 
@@ -153,85 +1033,1516 @@ def fresnel_coefficients(n1, n2, theta1, polarization):
         Liefert die Reflexions- und Transmissionskoeffizienten zusammen mit dem Brechungswinkel zurück.
     """
     theta2 = np.arcsin(n1 / n2 * np.sin(theta1))
-    if polarization == "Senkrecht":
-        r = (n1 * np.cos(theta1) - n2 * np.cos(theta2)) / (
-            n1 * np.cos(theta1) + n2 * np.cos(theta2)
-        )
-        t = (2 * n1 * np.cos(theta1)) / (n1 * np.cos(theta1) + n2 * np.cos(theta2))
-    elif polarization == "Parallel":
-        r = (n2 * np.cos(theta1) - n1 * np.cos(theta2)) / (
-            n2 * np.cos(theta1) + n1 * np.cos(theta2)
-        )
-        t = (2 * n1 * np.cos(theta1)) / (n2 * np.cos(theta1) + n1 * np.cos(theta2))
-    else:
-        raise ValueError("Polarization must be 's' or 'p'")
+    r, t = _fresnel_rt(n1, n2, np.cos(theta1), np.cos(theta2), polarization)
     return r, t, theta2
 
 
+def _fresnel_rt(n1, n2, cos1, cos2, polarization):
+    """Berechnet die Fresnel-Koeffizienten aus bereits bekannten Winkelkosinussen.
+
+    Args:
+        n1 (float): Brechungsindex der linken Schicht.
+        n2 (float): Brechungsindex der rechten Schicht.
+        cos1 (float): Kosinus des Einfallswinkels.
+        cos2 (float): Kosinus des Brechungswinkels.
+        polarization (str): Polarisation "Senkrecht" oder "Parallel".
+
+    Returns:
+        Reflexions- und Transmissionskoeffizient.
+    """
+    with instrumentation.stage("fresnel"):
+        if polarization == "Senkrecht":
+            r = (n1 * cos1 - n2 * cos2) / (n1 * cos1 + n2 * cos2)
+            t = (2 * n1 * cos1) / (n1 * cos1 + n2 * cos2)
+        elif polarization == "Parallel":
+            r = (n2 * cos1 - n1 * cos2) / (n2 * cos1 + n1 * cos2)
+            t = (2 * n1 * cos1) / (n2 * cos1 + n1 * cos2)
+        else:
+            raise ValueError("Polarization must be 's' or 'p'")
+    return r, t
+
+
 def transfer_matrix(material_list, d_list, wavelength, polarization, theta0):
     """Berechnet die Gesamttransfermatrix eines Mehrschichtsystems.
 
     Args:
         material_list (list): Liste an Material-Objekten.
         d_list (list): Liste der jeweiligen Dicken aus den Material-Objekten in Nanometer.
-        wavelength (list | float): Für Funktion der Wellenlänge eine Liste an Wellenlängen, andernfalls eine einzige Wellenlänge in Meter.
+        wavelength (float): Eine einzige Wellenlänge in Meter.
         polarization (str): Polarisation als "Senkrecht" oder "Parallel".
         theta0 (float): Einfallswinkel in Radiant.
 
     Returns:
         Liefert eine vollendete Transfermatrix zurück.
     """
-    M = np.identity(2, dtype=complex)
-    theta = [theta0]
+    return transfer_matrix_batch(
+        material_list, d_list, wavelength, polarization, theta0
+    )[0]
 
-    for i in range(len(material_list) - 1):
-        n1, n2 = (
-            material_list[i].refractive_index(wavelength),
-            material_list[i + 1].refractive_index(wavelength),
-        )
-        r, t, theta2 = fresnel_coefficients(n1, n2, theta[-1], polarization)
-        theta.append(theta2)
-
-        D = (1 / t) * np.array([[1, r], [r, 1]], dtype=complex)
-        if i < len(d_list):  # Schichten mit endlicher Dicke
-            k0 = 2 * np.pi / wavelength
-            beta = k0 * n2 * np.cos(theta2) * d_list[i]
-            P = np.array(
-                [[np.exp(-1j * beta), 0], [0, np.exp(1j * beta)]], dtype=complex
-            )
-            M = M @ D @ P
-        else:
-            M = M @ D
-    return M
 
+def transfer_matrix_batch(
+    material_list, d_list, wavelengths, polarization, thetas, precision="double"
+):
+    """Berechnet die Gesamttransfermatrizen eines Mehrschichtsystems für ein ganzes Raster.
 
-def reflectance(material_list, wavelengths, polarization, theta):
+    Alle Wellenlängen und Winkel werden gleichzeitig verarbeitet: Pro Grenzfläche
+    werden die 2x2-Matrizen aller Rasterpunkte als gestapeltes Array aufgebaut und
+    in einem Schritt multipliziert, sodass nur noch über die Schichten iteriert wird.
+
+    Args:
+        material_list (list): Liste an Material-Objekten.
+        d_list (list): Liste der Dicken aller endlichen Schichten in Meter.
+        wavelengths (list | float): Wellenlängen in Meter.
+        polarization (str | tuple): Polarisation als "Senkrecht" oder "Parallel" oder ein Tupel aus beiden.
+        thetas (list | float): Einfallswinkel in Radiant, wird gegen die Wellenlängen gebroadcastet.
+        precision (str): "double" (complex128) oder "single" (complex64), siehe PRECISIONS.
+
+    Returns:
+        Array der Form (N, 2, 2) mit einer Transfermatrix pro Rasterpunkt. Bei einem
+        Tupel an Polarisationen wird eine führende Achse pro Polarisation ergänzt;
+        Brechungsindizes, Brechungswinkel und Phasen werden dabei nur einmal berechnet.
+    """
+    M, _, _ = _transfer_matrices(
+        material_list, d_list, wavelengths, polarization, thetas, precision
+    )
+    return M
+
+
+def _transfer_matrices(
+    material_list, d_list, wavelengths, polarization, thetas, precision="double"
+):
+    """Rechenkern von transfer_matrix_batch.
+
+    Wiederholte Schichtfolgen (siehe find_periods) werden nicht Schicht für Schicht
+    multipliziert, sondern als Periodenmatrix potenziert. Bei reduzierter Genauigkeit
+    werden Winkel, Wellenzahlen und Brechungsindizes vorab umgewandelt, alle weiteren
+    Zwischenergebnisse übernehmen den Datentyp.
+
+    Returns:
+        Tupel aus den Transfermatrizen sowie (n, cos θ) des Einfallsmediums und des
+        Substrats, die für Transmission und Absorption benötigt werden.
+    """
+    _require_coherent(material_list)
+    if precision not in PRECISIONS:
+        raise ValueError("precision muss 'double' oder 'single' sein.")
+    dtype = PRECISIONS[precision]
+    periods = find_periods(material_list, d_list)
+    wls, theta, k0, indices = _prepare_grid(material_list, wavelengths, thetas)
+    if dtype is not np.complex128:
+        real = np.finfo(dtype).dtype
+        theta, k0 = theta.astype(real), k0.astype(real)
+        indices = [n.astype(dtype if np.iscomplexobj(n) else real) for n in indices]
+
+    polarizations = (
+        (polarization,) if isinstance(polarization, str) else tuple(polarization)
+    )
+    M = np.zeros((len(polarizations), wls.size, 2, 2), dtype=dtype)
+    M[..., 0, 0] = M[..., 1, 1] = 1
+    n1, cos1 = indices[0], np.cos(theta)
+    incident = (n1, cos1)
+
+    def interface(i, n1, cos1, theta):
+        # Grenzfläche i -> i+1 inklusive Propagation durch Schicht i+1 (D @ P)
+        n2 = indices[i + 1]
+        theta = np.arcsin(n1 / n2 * np.sin(theta))
+        cos2 = np.cos(theta)
+        d = d_list[i] if i < len(d_list) else None
+        D = _interface_matrix(n1, n2, cos1, cos2, k0, d, polarizations)
+        return D, n2, cos2, theta
+
+    runs = {start: (period, repeats) for start, period, repeats in periods}
+    i = 0
+    while i < len(material_list) - 1:
+        if i in runs:
+            # (Periode)^k: eine Periodenmatrix U bilden und U^(k-1) durch Quadrieren
+            period, repeats = runs[i]
+            U = None
+            for j in range(i, i + period):
+                D, n1, cos1, theta = interface(j, n1, cos1, theta)
+                U = D if U is None else _matmul(U, D)
+            M = _matmul(M, _matrix_power(U, repeats - 1))
+            i += (repeats - 1) * period
+            continue
+        D, n1, cos1, theta = interface(i, n1, cos1, theta)
+        M = _matmul(M, D)
+        i += 1
+    if isinstance(polarization, str):
+        M = M[0]
+    return M, incident, (n1, cos1)
+
+
+def _prepare_grid(material_list, wavelengths, thetas):
+    """Broadcastet Wellenlängen und Winkel und holt die Brechungsindizes aller Schichten.
+
+    Args:
+        material_list (list): Liste an Material-Objekten.
+        wavelengths (list | float): Wellenlängen in Meter.
+        thetas (list | float): Einfallswinkel in Radiant.
+
+    Returns:
+        Tupel aus flachen Wellenlängen, Winkeln, Wellenzahlen k0 und den Brechungsindizes pro Schicht.
+    """
+    wl_grid = np.atleast_1d(np.asarray(wavelengths, dtype=float))
+    theta_grid = np.atleast_1d(np.asarray(thetas, dtype=float))
+    shape = np.broadcast_shapes(wl_grid.shape, theta_grid.shape)
+    wls = np.broadcast_to(wl_grid, shape).ravel()
+    theta = np.broadcast_to(theta_grid, shape).ravel()
+    instrumentation.count("points", wls.size)
+
+    # Brechungsindizes nur auf dem ursprünglichen Raster auswerten und dann verteilen
+    indices = [
+        np.broadcast_to(n, shape).ravel() if n.ndim else n
+        for n in layer_indices(material_list, wl_grid)
+    ]
+    return wls, theta, 2 * np.pi / wls, indices
+
+
+def _interface_matrix(n1, n2, cos1, cos2, k0, d, polarizations):
+    """Baut die Matrizen D @ P einer Grenzfläche samt folgender Schicht für alle Rasterpunkte.
+
+    Args:
+        n1 (np.ndarray): Brechungsindex vor der Grenzfläche.
+        n2 (np.ndarray): Brechungsindex nach der Grenzfläche.
+        cos1 (np.ndarray): Kosinus des Winkels vor der Grenzfläche.
+        cos2 (np.ndarray): Kosinus des Winkels nach der Grenzfläche.
+        k0 (np.ndarray): Vakuum-Wellenzahlen in 1/m.
+        d (float): Dicke der folgenden Schicht in Meter, None für das Substrat.
+        polarizations (tuple): Polarisationen "Senkrecht" und/oder "Parallel".
+
+    Returns:
+        Array der Form (Anzahl Polarisationen, N, 2, 2).
+    """
+    instrumentation.count("layers")
+    with instrumentation.stage("matrices"):
+        r, t = np.stack(
+            [_fresnel_rt(n1, n2, cos1, cos2, p) for p in polarizations], axis=1
+        )
+
+        D = np.empty(r.shape + (2, 2), dtype=np.result_type(r, np.complex64))
+        if d is not None:  # Schichten mit endlicher Dicke, D @ P direkt aufgebaut
+            beta = k0 * n2 * cos2 * d
+            forward, backward = np.exp(-1j * beta) / t, np.exp(1j * beta) / t
+            D[..., 0, 0], D[..., 0, 1] = forward, r * backward
+            D[..., 1, 0], D[..., 1, 1] = r * forward, backward
+        else:
+            D[..., 0, 0] = D[..., 1, 1] = 1 / t
+            D[..., 0, 1] = D[..., 1, 0] = r / t
+    return D
+
+
+def _matmul(A, B):
+    """Multipliziert gestapelte 2x2-Matrizen elementweise ausgeschrieben.
+
+    Für viele kleine Matrizen deutlich schneller als der @-Operator.
+    """
+    with instrumentation.stage("products"):
+        C = np.empty(np.broadcast_shapes(A.shape, B.shape), dtype=np.result_type(A, B))
+        C[..., 0, 0] = A[..., 0, 0] * B[..., 0, 0] + A[..., 0, 1] * B[..., 1, 0]
+        C[..., 0, 1] = A[..., 0, 0] * B[..., 0, 1] + A[..., 0, 1] * B[..., 1, 1]
+        C[..., 1, 0] = A[..., 1, 0] * B[..., 0, 0] + A[..., 1, 1] * B[..., 1, 0]
+        C[..., 1, 1] = A[..., 1, 0] * B[..., 0, 1] + A[..., 1, 1] * B[..., 1, 1]
+    return C
+
+
+def _matvec(A, v):
+    """Multipliziert gestapelte 2x2-Matrizen mit gestapelten Vektoren der Länge 2."""
+    w = np.empty(np.broadcast_shapes(A.shape[:-1], v.shape), dtype=np.result_type(A, v))
+    w[..., 0] = A[..., 0, 0] * v[..., 0] + A[..., 0, 1] * v[..., 1]
+    w[..., 1] = A[..., 1, 0] * v[..., 0] + A[..., 1, 1] * v[..., 1]
+    return w
+
+
+def _matrix_power(U, exponent: int):
+    """Potenziert gestapelte 2x2-Matrizen durch wiederholtes Quadrieren.
+
+    Args:
+        U (np.ndarray): Matrizen der Form (..., 2, 2).
+        exponent (int): Exponent >= 1.
+
+    Returns:
+        U hoch exponent mit O(log exponent) Matrixprodukten.
+    """
+    result = None
+    while exponent:
+        if exponent & 1:
+            result = U if result is None else _matmul(result, U)
+        exponent >>= 1
+        if exponent:
+            U = _matmul(U, U)
+    return result
+
+
+def find_periods(material_list, d_list, max_period: int = 8, min_repeats: int = 3):
+    """Sucht direkt wiederholte Schichtfolgen wie (A/B)^N im Schichtsystem.
+
+    Zwei Schichten gelten als gleich, wenn Dispersionsparameter und Dicke übereinstimmen.
+    Gesucht wird gierig von vorne; pro Position gewinnt die Periode, die die meisten
+    Schichten abdeckt.
+
+    Args:
+        material_list (list): Liste an Material-Objekten.
+        d_list (list): Liste der Dicken aller endlichen Schichten in Meter.
+        max_period (int): Maximale Anzahl an Schichten pro Periode.
+        min_repeats (int): Minimale Anzahl an Wiederholungen, ab der sich das Potenzieren lohnt.
+
+    Returns:
+        Liste von Tupeln (erste Schicht, Schichten pro Periode, Wiederholungen).
+    """
+    keys = [
+        (m.dispersion_key(), d_list[j - 1] if 0 < j <= len(d_list) else None)
+        for j, m in enumerate(material_list)
+    ]
+    periods = []
+    i, last = (
+        1,
+        len(keys) - 1,
+    )  # Einfallsmedium und Substrat gehören nie zu einer Periode
+    while i < last:
+        best = None
+        for period in range(1, max_period + 1):
+            repeats = 1
+            while (
+                i + (repeats + 1) * period <= last
+                and keys[i + repeats * period : i + (repeats + 1) * period]
+                == keys[i : i + period]
+            ):
+                repeats += 1
+            if repeats >= min_repeats and (
+                best is None or repeats * period > best[0] * best[1]
+            ):
+                best = (period, repeats)
+        if best is None:
+            i += 1
+        else:
+            periods.append((i, *best))
+            i += best[0] * best[1]
+    return periods
+
+
+def periodic_stack(ambient, period, repeats: int, substrate, head=(), tail=()):
+    """Baut ein Schichtsystem der Form Einfallsmedium | head | (period)^N | tail | Substrat.
+
+    Die Perioden verweisen auf dieselben Material-Objekte, die Liste bleibt also auch
+    für große N klein. Die Periode wird von der Transfermatrix-Rechnung erkannt und
+    durch Potenzieren statt Schicht für Schicht berechnet.
+
+    Args:
+        ambient (Material): Einfallsmedium mit unendlicher Dicke.
+        period (list): Materialien einer Periode, mit gesetzten Dicken.
+        repeats (int): Anzahl der Perioden N.
+        substrate (Material): Substrat mit unendlicher Dicke.
+        head (list): Optionale Schichten vor den Perioden.
+        tail (list): Optionale Schichten nach den Perioden.
+
+    Returns:
+        Material-Liste für reflectance und verwandte Funktionen.
+    """
+    return [ambient, *head, *(list(period) * repeats), *tail, substrate]
+
+
+class OpticalResult:
+    """Ergebnis einer Transfermatrix-Rechnung mit allen daraus ableitbaren Größen.
+
+    Attributes:
+        R (np.ndarray): Reflexionsgrad.
+        T (np.ndarray): Transmissionsgrad ins Substrat.
+        A (np.ndarray): Absorptionsgrad des Schichtsystems, 1 - R - T.
+        r (np.ndarray): Komplexe Reflexionsamplitude, None bei gemischter Polarisation.
+        t (np.ndarray): Komplexe Transmissionsamplitude, None bei gemischter Polarisation.
+        precision_error (float): Größte Abweichung von R und T gegenüber "double" auf
+            den Stichproben, None bei Rechnung in doppelter Genauigkeit.
+    """
+
+    def __init__(self, R, T, r=None, t=None, precision_error=None):
+        self.R = R
+        self.T = T
+        self.A = 1 - R - T
+        self.r = r
+        self.t = t
+        self.precision_error = precision_error
+
+    @property
+    def phase_r(self):
+        """Phase der Reflexion in Radiant."""
+        return None if self.r is None else np.angle(self.r)
+
+    @property
+    def phase_t(self):
+        """Phase der Transmission in Radiant."""
+        return None if self.t is None else np.angle(self.t)
+
+    @staticmethod
+    def mix(result_s, result_p, s_share):
+        """Gewichtet die Ergebnisse beider Polarisationen zu teilpolarisiertem Licht.
+
+        Args:
+            result_s (OpticalResult): Ergebnis für senkrechte Polarisation.
+            result_p (OpticalResult): Ergebnis für parallele Polarisation.
+            s_share (float): Anteil senkrecht polarisierten Lichts.
+
+        Returns:
+            OpticalResult mit gemischten Intensitäten und ohne Amplituden.
+        """
+        errors = (result_s.precision_error, result_p.precision_error)
+        return OpticalResult(
+            s_share * result_s.R + (1 - s_share) * result_p.R,
+            s_share * result_s.T + (1 - s_share) * result_p.T,
+            precision_error=None if None in errors else max(errors),
+        )
+
+
+def _optical_results(
+    material_list, wavelengths, polarizations, theta, precision="double"
+):
+    """Berechnet R, T und die Amplituden für mehrere Polarisationen aus einem Durchlauf.
+
+    Args:
+        material_list (list): Liste von Material-Objekten.
+        wavelengths (list | float): Wellenlängen in Meter.
+        polarizations (tuple): Polarisationen "Senkrecht" und/oder "Parallel".
+        theta (list | float): Einfallswinkel in Radiant.
+        precision (str): Genauigkeit der Transfermatrizen, siehe PRECISIONS.
+
+    Returns:
+        Liste mit einem OpticalResult pro Polarisation.
+    """
+    if _incoherent_layers(material_list):
+        return _mixed_results(material_list, wavelengths, polarizations, theta)
+    d_list = [i.d * 1e-9 for i in material_list if i.d != np.inf]
+
+    with np.errstate(over="ignore", invalid="ignore"):
+        M, (n0, cos0), (ns, coss) = _transfer_matrices(
+            material_list, d_list, wavelengths, polarizations, theta, precision
+        )
+    if not np.all(np.isfinite(M)):
+        # exp(±iβ) dicker absorbierender Schichten ist übergelaufen, Warnungen
+        # anderer Ursachen meldet die Neuberechnung
+        return _mixed_results(material_list, wavelengths, polarizations, theta)
+    results = _results_from_matrices(M, polarizations, (n0, cos0), (ns, coss))
+    if precision != "double":
+        _check_precision(results, material_list, wavelengths, polarizations, theta)
+    return results
+
+
+def _check_precision(results, material_list, wavelengths, polarizations, theta):
+    """Vergleicht eine Rechnung reduzierter Genauigkeit auf Stichproben mit "double".
+
+    Aus dem gebroadcasteten Raster werden bis zu PRECISION_SAMPLES Punkte in doppelter
+    Genauigkeit nachgerechnet, je zur Hälfte gleichmäßig verteilt und an den steilsten
+    Stellen der Kurve, wo Rundungsfehler der Phasen am stärksten durchschlagen
+    (Bandkanten, schmale Resonanzen). Die größte Abweichung von R und T wird in
+    precision_error jedes Ergebnisses eingetragen; übersteigt sie PRECISION_TOLERANCE,
+    wird eine PrecisionWarning ausgegeben.
+
+    Args:
+        results (list): OpticalResult pro Polarisation, wird ergänzt.
+        material_list (list): Liste von Material-Objekten.
+        wavelengths (list | float): Wellenlängen in Meter.
+        polarizations (tuple): Polarisationen "Senkrecht" und/oder "Parallel".
+        theta (list | float): Einfallswinkel in Radiant.
+    """
+    wl_grid = np.atleast_1d(np.asarray(wavelengths, dtype=float))
+    theta_grid = np.atleast_1d(np.asarray(theta, dtype=float))
+    shape = np.broadcast_shapes(wl_grid.shape, theta_grid.shape)
+    size = int(np.prod(shape))
+    count = min(size, PRECISION_SAMPLES)
+    samples = np.linspace(0, size - 1, count - count // 2).round().astype(int)
+    if count // 2 and size > 2:
+        slope = sum(np.abs(result.R[2:] - result.R[:-2]) for result in results)
+        steep = np.argpartition(slope, -min(count // 2, slope.size))[-(count // 2) :]
+        samples = np.concatenate([samples, steep + 1])
+    samples = np.unique(samples)
+    references = _optical_results(
+        material_list,
+        np.broadcast_to(wl_grid, shape).ravel()[samples],
+        polarizations,
+        np.broadcast_to(theta_grid, shape).ravel()[samples],
+    )
+    error = 0.0
+    for result, reference in zip(results, references):
+        error = max(
+            error,
+            float(np.max(np.abs(result.R[samples] - reference.R))),
+            float(np.max(np.abs(result.T[samples] - reference.T))),
+        )
+    for result in results:
+        result.precision_error = error
+    if error > PRECISION_TOLERANCE:
+        warnings.warn(
+            f"Einfache Genauigkeit weicht auf {samples.size} Stichproben um bis zu "
+            f"{error:.2e} von doppelter Genauigkeit ab (Toleranz "
+            f"{PRECISION_TOLERANCE:.0e}).",
+            PrecisionWarning,
+        )
+
+
+def _admittance(incident, substrate, polarization):
+    """Admittanzverhältnis von Substrat und Einfallsmedium, auch für absorbierende Substrate.
+
+    Args:
+        incident (tuple): (n, cos θ) des Einfallsmediums.
+        substrate (tuple): (n, cos θ) des Substrats.
+        polarization (str): "Senkrecht" oder "Parallel".
+
+    Returns:
+        Faktor zwischen |t|² und dem Transmissionsgrad T.
+    """
+    (n0, cos0), (ns, coss) = incident, substrate
+    if polarization == "Senkrecht":
+        return np.real(ns * coss) / np.real(n0 * cos0)
+    return np.real(ns * np.conj(coss)) / np.real(n0 * np.conj(cos0))
+
+
+def _results_from_matrices(M, polarizations, incident, substrate):
+    """Bildet aus Gesamttransfermatrizen der Form (P, N, 2, 2) ein OpticalResult pro Polarisation."""
+    results = []
+    for polarization, Mp in zip(polarizations, M):
+        r = Mp[:, 1, 0] / Mp[:, 0, 0]
+        t = 1 / Mp[:, 0, 0]
+        admittance = _admittance(incident, substrate, polarization)
+        results.append(OpticalResult(np.abs(r) ** 2, admittance * np.abs(t) ** 2, r, t))
+    return results
+
+
+def _incoherent_layers(material_list):
+    """Liefert die Indizes aller als inkohärent markierten Innenschichten."""
+    return [i for i, m in enumerate(material_list[1:-1], start=1) if m.incoherent]
+
+
+def _require_coherent(material_list):
+    """Verhindert, dass rein kohärente Verfahren inkohärente Schichten still ignorieren.
+
+    Raises:
+        ValueError: Falls eine Innenschicht als inkohärent markiert ist.
+    """
+    if _incoherent_layers(material_list):
+        raise ValueError(
+            "Inkohärente Schichten werden nur von reflectance und optical_response unterstützt."
+        )
+
+
+def _mixed_results(material_list, wavelengths, polarizations, theta):
+    """Gemischt kohärent/inkohärente Rechnung mit der verallgemeinerten Matrixmethode.
+
+    Die inkohärenten Schichten teilen das System in kohärente Gruppen. Jede Gruppe wird
+    mit Amplituden gerechnet und auf die Intensitäten (R, T) für beide Richtungen
+    reduziert; die Gruppen werden dann über die inkohärenten Schichten hinweg mit
+    Intensitäten kombiniert (Summe aller Mehrfachreflexionen). Es treten nur
+    abklingende Exponentialfaktoren auf: Innerhalb einer Gruppe wird jede
+    Propagationsmatrix durch exp(|Im β|) geteilt und der Faktor logarithmisch
+    mitgeführt, zwischen den Gruppen wird nur die Dämpfung exp(-2 |Im β|) benötigt.
+    Ohne inkohärente Schichten ist das die überlauffeste Variante der kohärenten Rechnung.
+
+    Args:
+        material_list (list): Liste von Material-Objekten.
+        wavelengths (list | float): Wellenlängen in Meter.
+        polarizations (tuple): Polarisationen "Senkrecht" und/oder "Parallel".
+        theta (list | float): Einfallswinkel in Radiant.
+
+    Returns:
+        Liste mit einem OpticalResult pro Polarisation, Amplituden nur ohne
+        inkohärente Schichten.
+    """
+    wls, theta, k0, indices = _prepare_grid(material_list, wavelengths, theta)
+    cos = [np.cos(theta)]
+    for n1, n2 in zip(indices, indices[1:]):
+        theta = np.arcsin(n1 / n2 * np.sin(theta))
+        cos.append(np.cos(theta))
+
+    def beta(i):
+        return k0 * indices[i] * cos[i] * (material_list[i].d * 1e-9)
+
+    def admittance(a, b):
+        return np.stack(
+            [
+                _admittance((indices[a], cos[a]), (indices[b], cos[b]), p)
+                for p in polarizations
+            ]
+        )
+
+    def group(a, b):
+        # Kohärente Gruppe zwischen den (inkohärenten) Medien a und b
+        M, log_scale, det = None, 0.0, 1.0
+        for i in range(a, b):
+            D = _interface_matrix(
+                indices[i], indices[i + 1], cos[i], cos[i + 1], k0, None, polarizations
+            )
+            det = det * (D[..., 0, 0] * D[..., 1, 1] - D[..., 0, 1] * D[..., 1, 0])
+            if i + 1 < b:
+                phase = beta(i + 1)
+                scale = np.abs(phase.imag)
+                D[..., :, 0] *= np.exp(-1j * phase - scale)[:, np.newaxis]
+                D[..., :, 1] *= np.exp(1j * phase - scale)[:, np.newaxis]
+                log_scale = log_scale + scale
+            M = D if M is None else _matmul(M, D)
+        r = M[..., 1, 0] / M[..., 0, 0]
+        t = np.exp(-log_scale) / M[..., 0, 0]
+        r_back = -M[..., 0, 1] / M[..., 0, 0]
+        t_back = det * t
+        intensities = (
+            np.abs(r) ** 2,
+            admittance(a, b) * np.abs(t) ** 2,
+            np.abs(r_back) ** 2,
+            admittance(b, a) * np.abs(t_back) ** 2,
+        )
+        return intensities, r, t
+
+    bounds = [0] + _incoherent_layers(material_list) + [len(material_list) - 1]
+    (R, T, R_back, T_back), r, t = group(bounds[0], bounds[1])
+    for a, b in zip(bounds[1:-1], bounds[2:]):
+        P = np.exp(-2 * np.abs(beta(a).imag))
+        (R2, T2, R2_back, T2_back), _, _ = group(a, b)
+        denominator = 1 - R_back * R2 * P**2
+        R, T, R_back, T_back = (
+            R + T * T_back * R2 * P**2 / denominator,
+            T * T2 * P / denominator,
+            R2_back + T2_back * T2 * R_back * P**2 / denominator,
+            T2_back * T_back * P / denominator,
+        )
+    if len(bounds) > 2:
+        return [OpticalResult(R[i], T[i]) for i in range(len(polarizations))]
+    return [OpticalResult(R[i], T[i], r[i], t[i]) for i in range(len(polarizations))]
+
+
+def optical_response(
+    material_list, wavelengths, polarization, theta, precision="double"
+):
+    """Berechnet Reflexion, Transmission, Absorption und Phasen in einem Durchlauf.
+
+    Args:
+        material_list (list): Liste von Material-Objekten.
+        wavelengths (list | float): Wellenlängen in Meter.
+        polarization (str | float): Polarisation wie bei reflectance.
+        theta (list | float): Einfallswinkel in Radiant.
+        precision (str): "double" oder "single"; bei "single" wird auf Stichproben
+            gegen "double" geprüft, siehe _check_precision.
+
+    Returns:
+        OpticalResult mit R, T, A und bei reiner Polarisation den komplexen Amplituden r und t.
+    """
+    if polarization in POLARIZATIONS:
+        return _optical_results(
+            material_list, wavelengths, (polarization,), theta, precision
+        )[0]
+    s_share = polarization_share(polarization)
+    result_s, result_p = _optical_results(
+        material_list, wavelengths, POLARIZATIONS, theta, precision
+    )
+    return OpticalResult.mix(result_s, result_p, s_share)
+
+
+def reflectance(material_list, wavelengths, polarization, theta, precision="double"):
     """Berechnet den Reflexionsgrad als Funktion des Einfallswinkels oder der Wellenlänge.
 
     Args:
         material_list (list): Liste von Material-Objekten.
         wavelengths (list | float): Für Funktion der Wellenlänge eine Liste an Wellenlängen, andernfalls eine einzige Wellenlänge in Meter.
-        polarization (str): Polarization als "Senkrecht" oder "Parallel".
+        polarization (str | float): Polarization als "Senkrecht", "Parallel" oder "Unpolarisiert", alternativ der s-Anteil zwischen 0 und 1.
         theta (list | float): Für Funktion der Wellenlänge ein Float, andernfalls eine Liste an Winkeln. Beides in Radiant
+        precision (str): "double" oder "single" (complex64) für sehr große Raster.
 
     Returns:
         Eine Liste von allen Reflexionsgraden in Abhängigkeit von entweder der Wellenlänge oder des Einfallswinkels.
 
     """
-    R = []
+    return optical_response(
+        material_list, wavelengths, polarization, theta, precision
+    ).R
+
+
+def reflectance_sp(material_list, wavelengths, theta, precision="double"):
+    """Berechnet s- und p-Reflexionsgrad in einem gemeinsamen Durchlauf.
+
+    Args:
+        material_list (list): Liste von Material-Objekten.
+        wavelengths (list | float): Wellenlängen in Meter.
+        theta (list | float): Einfallswinkel in Radiant.
+        precision (str): "double" oder "single", siehe reflectance.
+
+    Returns:
+        Tupel (R_s, R_p) der Reflexionsgrade für senkrechte und parallele Polarisation.
+    """
+    result_s, result_p = _optical_results(
+        material_list, wavelengths, POLARIZATIONS, theta, precision
+    )
+    return result_s.R, result_p.R
+
+
+def polarization_share(polarization):
+    """Bestimmt den Anteil senkrecht polarisierten Lichts.
+
+    Args:
+        polarization (str | float): "Senkrecht", "Parallel", "Unpolarisiert" oder ein s-Anteil zwischen 0 und 1.
+
+    Raises:
+        ValueError: Falls die Angabe keine gültige Polarisation ist.
+
+    Returns:
+        s-Anteil als Float zwischen 0 und 1.
+    """
+    if isinstance(polarization, str):
+        shares = {"Senkrecht": 1.0, "Parallel": 0.0, "Unpolarisiert": 0.5}
+        if polarization not in shares:
+            raise ValueError(
+                "Polarisation muss 'Senkrecht', 'Parallel' oder 'Unpolarisiert' sein."
+            )
+        return shares[polarization]
+    share = float(polarization)
+    if not 0 <= share <= 1:
+        raise ValueError("Der s-Anteil der Polarisation muss zwischen 0 und 1 liegen.")
+    return share
+
+
+def reflectance_map(
+    material_list, wavelengths, polarization, thetas, precision="double"
+):
+    """Berechnet den Reflexionsgrad auf dem vollständigen Raster aus Wellenlängen und Winkeln.
+
+    Anders als bei reflectance werden Wellenlängen und Winkel nicht paarweise
+    kombiniert, sondern jede Wellenlänge mit jedem Winkel in einem Durchlauf berechnet.
+
+    Args:
+        material_list (list): Liste von Material-Objekten.
+        wavelengths (list): Wellenlängen in Meter.
+        polarization (str | float): Polarisation wie bei reflectance.
+        thetas (list): Einfallswinkel in Radiant.
+        precision (str): "double" oder "single", siehe reflectance.
+
+    Returns:
+        Array R[λ, θ] der Form (Anzahl Wellenlängen, Anzahl Winkel).
+    """
+    wls = np.atleast_1d(np.asarray(wavelengths, dtype=float))
+    angles = np.atleast_1d(np.asarray(thetas, dtype=float))
+    R = reflectance(material_list, wls[:, np.newaxis], polarization, angles, precision)
+    return R.reshape(wls.size, angles.size)
+
+
+result_cache = LRUCache(max_entries=4096, max_bytes=64 * 2**20)
+
+
+def stack_key(material_list):
+    """Bildet einen kanonischen Hash eines Schichtsystems.
+
+    Eingerechnet werden alle Dispersionsparameter, Dicken und inkohärente Schichten,
+    nicht aber die Namen: Zwei gleich aufgebaute Systeme teilen sich ihre Ergebnisse.
+
+    Args:
+        material_list (list): Liste von Material-Objekten.
+
+    Returns:
+        Hex-Digest der Schichtfolge.
+    """
+    layers = tuple(
+        (m.dispersion_key(), float(m.d), bool(m.incoherent)) for m in material_list
+    )
+    return hashlib.blake2b(repr(layers).encode(), digest_size=16).hexdigest()
+
+
+def memoized(kind, material_list, wavelengths, polarization, theta, compute):
+    """Liefert ein Ergebnis aus dem result_cache oder berechnet und speichert es.
+
+    Der Schlüssel besteht aus kind, stack_key, beiden Rastern und der Polarisation,
+    die dafür auf "Senkrecht", "Parallel" oder den s-Anteil vereinheitlicht wird.
+
+    Args:
+        kind (hashable): Art des Ergebnisses samt aller weiteren Parameter der Rechnung.
+        material_list (list): Liste von Material-Objekten.
+        wavelengths (list | float): Wellenlängen in Meter.
+        polarization (str | float): Polarisation wie bei reflectance oder None.
+        theta (list | float): Einfallswinkel in Radiant.
+        compute (callable): Parameterloser Aufruf, der das Ergebnis als Array liefert.
+
+    Returns:
+        Schreibgeschütztes Ergebnis-Array.
+    """
+    if polarization is not None and polarization not in POLARIZATIONS:
+        polarization = polarization_share(polarization)
+    key = (
+        kind,
+        stack_key(material_list),
+        _grid_key(np.ascontiguousarray(wavelengths, dtype=float)),
+        _grid_key(np.ascontiguousarray(theta, dtype=float)),
+        polarization,
+    )
+    value = result_cache.get(key)
+    if value is None:
+        value = np.array(compute())
+        value.setflags(write=False)
+        result_cache.put(key, value)
+    return value
+
+
+def cached_reflectance(
+    material_list, wavelengths, polarization, theta, precision="double"
+):
+    """Wie reflectance, aber über den result_cache memoisiert."""
+    return memoized(
+        ("R", precision),
+        material_list,
+        wavelengths,
+        polarization,
+        theta,
+        lambda: reflectance(material_list, wavelengths, polarization, theta, precision),
+    )
+
+
+def cached_reflectance_sp(material_list, wavelengths, theta, precision="double"):
+    """Wie reflectance_sp, aber über den result_cache memoisiert."""
+    R_s, R_p = memoized(
+        ("R_sp", precision),
+        material_list,
+        wavelengths,
+        None,
+        theta,
+        lambda: reflectance_sp(material_list, wavelengths, theta, precision),
+    )
+    return R_s, R_p
+
+
+def cached_reflectance_map(
+    material_list, wavelengths, polarization, thetas, precision="double"
+):
+    """Wie reflectance_map, aber über den result_cache memoisiert."""
+    return memoized(
+        ("R_map", precision),
+        material_list,
+        wavelengths,
+        polarization,
+        thetas,
+        lambda: reflectance_map(
+            material_list, wavelengths, polarization, thetas, precision
+        ),
+    )
+
+
+def adaptive_grid(
+    function,
+    start: float,
+    stop: float,
+    tolerance: float = 1e-3,
+    max_points: int = 2000,
+    initial_points: int = 65,
+    cancelled=None,
+):
+    """Tastet eine Funktion adaptiv ab und verdichtet nur dort, wo sie stark gekrümmt ist.
+
+    Ausgehend von einem groben, gleichmäßigen Raster wird in jeder Runde die Mitte
+    aller noch offenen Intervalle in einem einzigen Aufruf berechnet und eingefügt.
+    Die Hälften eines Intervalls bleiben offen, solange die Abweichung seiner Mitte
+    von der linearen Interpolation oder die seines Elternintervalls tolerance
+    übersteigt. Erst zwei aufeinanderfolgende Ebenen unter tolerance schließen ein
+    Intervall; eine Mitte, die bei einem Wendepunkt zufällig nahe der Sehne liegt,
+    reicht damit nicht aus. Reicht das Punktbudget nicht, werden die Intervalle mit
+    der größten Abweichung bevorzugt und die Toleranz wird nicht garantiert.
+
+    Args:
+        function (callable): Vektorisierte Funktion, die ein Array von x-Werten auf
+            Werte der Form (..., Anzahl x) abbildet.
+        start (float): Beginn des Bereichs.
+        stop (float): Ende des Bereichs.
+        tolerance (float): Erlaubte Abweichung der linearen Interpolation.
+        max_points (int): Höchstzahl an Stützstellen.
+        initial_points (int): Stützstellen des Startrasters; schmalere Strukturen
+            als dessen Abstand können unentdeckt bleiben.
+        cancelled (callable): Liefert True, wenn die Verfeinerung abgebrochen werden
+            soll; wird vor jeder Runde geprüft, zurückgegeben wird das bisherige Raster.
+
+    Returns:
+        Tupel aus sortierten Stützstellen und den zugehörigen Funktionswerten.
+
+    Raises:
+        ValueError: Bei ungültiger Toleranz oder zu kleinem Punktbudget.
+    """
+    if tolerance <= 0:
+        raise ValueError("Toleranz muss größer als 0 sein.")
+    if max_points < 2:
+        raise ValueError("Es werden mindestens 2 Stützstellen benötigt.")
+    x = np.linspace(start, stop, max(2, min(initial_points, max_points)))
+    y = np.asarray(function(x))
+    errors = np.full(x.size - 1, np.inf)
+    pending = np.ones(x.size - 1, dtype=bool)
+    while True:
+        candidates = np.flatnonzero(pending)
+        budget = max_points - x.size
+        if (
+            candidates.size == 0
+            or budget <= 0
+            or (cancelled is not None and cancelled())
+        ):
+            break
+        if candidates.size > budget:
+            candidates = np.sort(candidates[np.argsort(-errors[candidates])[:budget]])
+        midpoints = (x[candidates] + x[candidates + 1]) / 2
+        values = np.asarray(function(midpoints))
+        linear = (y[..., candidates] + y[..., candidates + 1]) / 2
+        error = np.abs(values - linear).reshape(-1, candidates.size).max(axis=0)
+        # Beide Hälften übernehmen die Abweichung der Mitte als Schätzwert und
+        # bleiben offen, bis auch die vorige Ebene unter der Toleranz lag
+        reopen = (error > tolerance) | (errors[candidates] > tolerance)
+        x = np.insert(x, candidates + 1, midpoints)
+        y = np.insert(y, candidates + 1, values, axis=-1)
+        left = candidates + np.arange(candidates.size)
+        errors = np.insert(errors, candidates + 1, error)
+        errors[left] = error
+        pending = np.insert(pending, candidates + 1, reopen)
+        pending[left] = reopen
+    return x, y
+
+
+def reflectance_adaptive(
+    material_list,
+    wavelengths,
+    polarization,
+    theta,
+    tolerance: float = 1e-3,
+    max_points: int = 2000,
+):
+    """Berechnet ein Reflexionsspektrum auf einem adaptiv verfeinerten Raster.
+
+    Genau einer der Parameter wavelengths und theta wird als Bereich (Start, Ende)
+    angegeben, der andere als Einzelwert.
+
+    Args:
+        material_list (list): Liste von Material-Objekten.
+        wavelengths (float | tuple): Wellenlänge oder Wellenlängenbereich in Meter.
+        polarization (str | float): Polarisation wie bei reflectance.
+        theta (float | tuple): Einfallswinkel oder Winkelbereich in Radiant.
+        tolerance (float): Erlaubter Fehler von R bei linearer Interpolation.
+        max_points (int): Höchstzahl an Stützstellen.
+
+    Returns:
+        Tupel aus Stützstellen (Wellenlängen bzw. Winkel) und Reflexionsgraden.
+
+    Raises:
+        ValueError: Wenn nicht genau ein Bereich angegeben ist.
+    """
+    sweep_wavelength = np.size(wavelengths) == 2
+    if sweep_wavelength == (np.size(theta) == 2):
+        raise ValueError(
+            "Genau einer von Wellenlänge und Winkel muss ein Bereich sein."
+        )
+    if sweep_wavelength:
+        return adaptive_grid(
+            lambda x: reflectance(material_list, x, polarization, theta),
+            *wavelengths,
+            tolerance,
+            max_points,
+        )
+    return adaptive_grid(
+        lambda x: reflectance(material_list, wavelengths, polarization, x),
+        *theta,
+        tolerance,
+        max_points,
+    )
+
+
+class IncrementalStack:
+    """Schichtsystem mit zwischengespeicherten Teilprodukten der Transfermatrix.
+
+    Für ein festes Raster werden pro Grenzfläche i die Matrix E_i = D_i,i+1 · P_i+1,
+    die Präfixprodukte F_i = E_0 ⋯ E_(i-1) und die Suffixprodukte G_i = E_i ⋯ E_(L-2)
+    gehalten; für jedes i gilt M = F_i · G_i. Ändert sich nur die Dicke von Schicht k,
+    wird allein P_k neu gebildet und M = (F_(k-1) · E_(k-1)) · G_k mit zwei
+    Multiplikationen pro Rasterpunkt bestimmt. Präfixe hinter und Suffixe vor einer
+    Änderung werden verworfen und erst bei Bedarf aus dem nächsten gültigen Nachbarn
+    neu aufgebaut. Ein anderes Raster, ein anderes Einfallsmedium oder eine andere
+    Schichtanzahl führen zu einem vollständigen Neuaufbau.
+
+    Der Speicherbedarf wächst mit Schichtanzahl mal Rasterpunkten; alle Methoden sind
+    threadsicher.
+
+    Attributes:
+        polarizations (tuple): Berechnete Polarisationen "Senkrecht" und/oder "Parallel".
+        s_share (float): Anteil senkrecht polarisierten Lichts für result.
+    """
+
+    def __init__(self, material_list, wavelengths, polarization, theta):
+        """Baut alle Grenzflächenmatrizen und Teilprodukte einmal vollständig auf.
+
+        Args:
+            material_list (list): Liste von Material-Objekten.
+            wavelengths (list | float): Wellenlängen in Meter.
+            polarization (str | float): Polarisation wie bei reflectance.
+            theta (list | float): Einfallswinkel in Radiant.
+        """
+        if polarization in POLARIZATIONS:
+            self.polarizations = (polarization,)
+            self.s_share = 1.0 if polarization == "Senkrecht" else 0.0
+        else:
+            self.polarizations = POLARIZATIONS
+            self.s_share = polarization_share(polarization)
+        self._lock = threading.RLock()
+        self._build(material_list, wavelengths, theta)
+
+    def _build(self, material_list, wavelengths, theta):
+        _require_coherent(material_list)
+        self._wavelengths = np.atleast_1d(np.asarray(wavelengths, dtype=float))
+        self._theta = np.atleast_1d(np.asarray(theta, dtype=float))
+        self._grid = (_grid_key(self._wavelengths), _grid_key(self._theta))
+        wls, theta, self._k0, self._n = _prepare_grid(
+            material_list, self._wavelengths, self._theta
+        )
+        self._keys = [m.dispersion_key() for m in material_list]
+        self._d = [m.d for m in material_list]
+        # Snellius: n · sin θ ist in allen Schichten gleich
+        self._invariant = self._n[0] * np.sin(theta)
+        self._cos = [np.cos(theta)] + [
+            np.cos(np.arcsin(self._invariant / n)) for n in self._n[1:]
+        ]
+        self._D = [self._interface(i) for i in range(len(material_list) - 1)]
+        self._E = [self._propagate(i) for i in range(len(material_list) - 1)]
+        identity = np.zeros((len(self.polarizations), wls.size, 2, 2), dtype=complex)
+        identity[..., 0, 0] = identity[..., 1, 1] = 1
+        # Gültig sind F_0 ... F_prefix und G_suffix ... G_(L-1)
+        self._F = [identity]
+        for E in self._E:
+            self._F.append(_matmul(self._F[-1], E))
+        self._G = [identity]
+        for E in reversed(self._E):
+            self._G.insert(0, _matmul(E, self._G[0]))
+        self._prefix, self._suffix = len(self._E), 0
+        self._M = self._F[-1]
+
+    def _interface(self, i):
+        # Grenzfläche i -> i+1 ohne Propagation
+        return _interface_matrix(
+            self._n[i],
+            self._n[i + 1],
+            self._cos[i],
+            self._cos[i + 1],
+            self._k0,
+            None,
+            self.polarizations,
+        )
+
+    def _propagate(self, i):
+        # E_i = D_i · P_(i+1): die Spalten von D werden mit e^(∓iβ) skaliert
+        if i + 1 == len(self._d) - 1:
+            return self._D[i]
+        beta = self._k0 * self._n[i + 1] * self._cos[i + 1] * self._d[i + 1] * 1e-9
+        E = self._D[i].copy()
+        E[..., 0] *= np.exp(-1j * beta)[..., np.newaxis]
+        E[..., 1] *= np.exp(1j * beta)[..., np.newaxis]
+        return E
+
+    def _invalidate(self, first, last):
+        # Grenzflächen first..last haben sich geändert
+        self._prefix = min(self._prefix, first)
+        self._suffix = max(self._suffix, last + 1)
+        self._M = None
+
+    def set_thickness(self, layer: int, d: float):
+        """Ändert die Dicke einer Innenschicht.
+
+        Args:
+            layer (int): Index der Schicht in der Material-Liste (1 = erste Schicht).
+            d (float): Neue Dicke in nm.
+
+        Raises:
+            ValueError: Bei Einfallsmedium oder Substrat.
+        """
+        if not 0 < layer < len(self._d) - 1:
+            raise ValueError("Nur die Dicke von Innenschichten kann geändert werden.")
+        with self._lock:
+            if d == self._d[layer]:
+                return
+            self._d[layer] = d
+            self._E[layer - 1] = self._propagate(layer - 1)
+            self._invalidate(layer - 1, layer - 1)
+
+    def set_material(self, layer: int, material):
+        """Ersetzt das Material einer Schicht oder des Substrats samt Dicke.
+
+        Args:
+            layer (int): Index der Schicht in der Material-Liste.
+            material (Material): Neues Material.
+
+        Raises:
+            ValueError: Beim Einfallsmedium, das alle Winkel bestimmt, oder bei einer
+                inkohärenten Innenschicht.
+        """
+        if not 0 < layer < len(self._d):
+            raise ValueError(
+                "Das Einfallsmedium kann nur durch Neuaufbau geändert werden."
+            )
+        if material.incoherent and layer < len(self._d) - 1:
+            _require_coherent([None, material, None])
+        with self._lock:
+            key = material.dispersion_key()
+            if key == self._keys[layer] and material.d == self._d[layer]:
+                return
+            self._keys[layer], self._d[layer] = key, material.d
+            (n,) = layer_indices([material], self._wavelengths)
+            shape = np.broadcast_shapes(self._wavelengths.shape, self._theta.shape)
+            self._n[layer] = np.broadcast_to(n, shape).ravel() if n.ndim else n
+            self._cos[layer] = np.cos(np.arcsin(self._invariant / self._n[layer]))
+            last = min(layer, len(self._E) - 1)
+            for i in range(layer - 1, last + 1):
+                self._D[i] = self._interface(i)
+                self._E[i] = self._propagate(i)
+            self._invalidate(layer - 1, last)
+
+    def update(self, material_list, wavelengths=None, theta=None):
+        """Gleicht den Zustand mit einem geänderten Schichtsystem oder Raster ab.
+
+        Args:
+            material_list (list): Aktuelle Liste von Material-Objekten.
+            wavelengths (list | float): Neues Wellenlängenraster, None für unverändert.
+            theta (list | float): Neue Einfallswinkel, None für unverändert.
+
+        Returns:
+            Anzahl der geänderten Schichten, -1 bei vollständigem Neuaufbau.
+
+        Raises:
+            ValueError: Falls eine Innenschicht als inkohärent markiert ist, auch wenn
+                sich nur diese Markierung geändert hat.
+        """
+        _require_coherent(material_list)
+        with self._lock:
+            wavelengths = self._wavelengths if wavelengths is None else wavelengths
+            theta = self._theta if theta is None else theta
+            grid = (
+                _grid_key(np.atleast_1d(np.asarray(wavelengths, dtype=float))),
+                _grid_key(np.atleast_1d(np.asarray(theta, dtype=float))),
+            )
+            if (
+                grid != self._grid
+                or len(material_list) != len(self._d)
+                or material_list[0].dispersion_key() != self._keys[0]
+            ):
+                self._build(material_list, wavelengths, theta)
+                return -1
+            changed = 0
+            for layer, material in enumerate(material_list[1:], start=1):
+                if material.dispersion_key() != self._keys[layer]:
+                    self.set_material(layer, material)
+                elif material.d != self._d[layer]:
+                    self.set_thickness(layer, material.d)
+                else:
+                    continue
+                changed += 1
+            return changed
+
+    def matrix(self):
+        """Liefert die Gesamttransfermatrizen der Form (Anzahl Polarisationen, N, 2, 2)."""
+        with self._lock:
+            if self._M is None:
+                # Präfixe bis zum ersten gültigen Suffix nachziehen, dann M = F_s · G_s
+                for i in range(self._prefix, self._suffix):
+                    self._F[i + 1] = _matmul(self._F[i], self._E[i])
+                self._prefix = max(self._prefix, self._suffix)
+                self._M = _matmul(self._F[self._suffix], self._G[self._suffix])
+            return self._M
+
+    def results(self):
+        """Liefert ein OpticalResult pro berechneter Polarisation."""
+        with self._lock:
+            cos = self._cos
+            return _results_from_matrices(
+                self.matrix(),
+                self.polarizations,
+                (self._n[0], cos[0]),
+                (self._n[-1], cos[-1]),
+            )
+
+    def evaluate(self, material_list, wavelengths=None, theta=None):
+        """Gleicht den Zustand ab und liefert die Ergebnisse in einem Schritt.
+
+        Anders als update gefolgt von results kann dazwischen kein anderer Thread
+        den Zustand auf ein anderes Schichtsystem umstellen.
+
+        Args:
+            material_list (list): Aktuelle Liste von Material-Objekten.
+            wavelengths (list | float): Neues Wellenlängenraster, None für unverändert.
+            theta (list | float): Neue Einfallswinkel, None für unverändert.
+
+        Returns:
+            Liste mit einem OpticalResult pro berechneter Polarisation.
+        """
+        with self._lock:
+            self.update(material_list, wavelengths, theta)
+            return self.results()
+
+    def result(self):
+        """Liefert R, T und A für die gewählte Polarisation wie optical_response."""
+        results = self.results()
+        if len(results) == 1:
+            return results[0]
+        return OpticalResult.mix(*results, self.s_share)
+
+    def reflectance(self):
+        """Liefert den Reflexionsgrad wie reflectance."""
+        return self.result().R
+
+
+def _derivative_matrix(A, B, forward, backward):
+    """Baut 1/2 [[(A+B)·e⁻, (A-B)·e⁺], [(A-B)·e⁻, (A+B)·e⁺]] für gestapelte Werte."""
+    E = np.empty(np.broadcast_shapes(np.shape(A), np.shape(B)) + (2, 2), dtype=complex)
+    E[..., 0, 0], E[..., 0, 1] = (A + B) * forward / 2, (A - B) * backward / 2
+    E[..., 1, 0], E[..., 1, 1] = (A - B) * forward / 2, (A + B) * backward / 2
+    return E
+
+
+def reflectance_gradient(material_list, wavelengths, polarization, theta):
+    """Berechnet R und dessen analytische Ableitungen nach Dicke und Brechungsindex aller Schichten.
+
+    Args:
+        material_list (list): Liste von Material-Objekten.
+        wavelengths (list | float): Wellenlängen in Meter.
+        polarization (str | float): Polarisation wie bei reflectance.
+        theta (list | float): Einfallswinkel in Radiant.
+
+    Returns:
+        Tupel (R, dR_dd, dR_dn, dR_dk), siehe optical_gradient.
+    """
+    return optical_gradient(material_list, wavelengths, polarization, theta)
+
+
+def transmittance_gradient(material_list, wavelengths, polarization, theta):
+    """Berechnet T und dessen analytische Ableitungen nach Dicke und Brechungsindex aller Schichten.
+
+    Args:
+        material_list (list): Liste von Material-Objekten.
+        wavelengths (list | float): Wellenlängen in Meter.
+        polarization (str | float): Polarisation wie bei reflectance.
+        theta (list | float): Einfallswinkel in Radiant.
+
+    Returns:
+        Tupel (T, dT_dd, dT_dn, dT_dk), siehe optical_gradient.
+    """
+    return optical_gradient(material_list, wavelengths, polarization, theta, "T")
+
+
+def optical_gradient(
+    material_list, wavelengths, polarization, theta, quantity="R", indices=True
+):
+    """Berechnet R oder T und die analytischen Ableitungen nach den Schichtparametern.
+
+    Mit D @ P = 1/2 [[a+b, a-b], [a-b, a+b]] · P (s: a=1, b=q2/q1 mit q = n cos θ;
+    p: a=n2/n1, b=cos2/cos1) lassen sich die Ableitungen jeder Grenzflächenmatrix
+    geschlossen angeben. Ein Vorwärtsdurchlauf speichert die Präfixprodukte, ein
+    Rückwärtsdurchlauf die erste Spalte der Suffixprodukte; daraus folgt die gesamte
+    Jacobi-Matrix ohne erneute Transfermatrix-Rechnungen.
+
+    Args:
+        material_list (list): Liste von Material-Objekten.
+        wavelengths (list | float): Wellenlängen in Meter.
+        polarization (str | float): Polarisation wie bei reflectance.
+        theta (list | float): Einfallswinkel in Radiant.
+        quantity (str): "R" für Reflexion oder "T" für Transmission.
+        indices (bool): False überspringt die Ableitungen nach dem Brechungsindex.
+
+    Returns:
+        Tupel (Wert, d_dd, d_dn, d_dk). Die Ableitungen haben die Form
+        (Anzahl Innenschichten, N): d_dd pro Nanometer Schichtdicke, d_dn und
+        d_dk nach Real- und Imaginärteil des Brechungsindex der Innenschichten.
+        Bei indices=False sind d_dn und d_dk None.
+
+    Raises:
+        ValueError: Bei unbekannter Größe.
+    """
+    if quantity not in ("R", "T"):
+        raise ValueError("Größe muss 'R' oder 'T' sein.")
+    if polarization in POLARIZATIONS:
+        polarizations, weights = (polarization,), np.array([1.0])
+    else:
+        s_share = polarization_share(polarization)
+        polarizations, weights = POLARIZATIONS, np.array([s_share, 1 - s_share])
+    weights = weights[:, np.newaxis]
 
     d_list = [i.d * 1e-9 for i in material_list if i.d != np.inf]
+    _require_coherent(material_list)
+    wls, theta, k0, n = _prepare_grid(material_list, wavelengths, theta)
+    layers = len(material_list)
+    cos = [np.cos(theta)]
+    for i in range(layers - 1):
+        theta = np.arcsin(n[i] / n[i + 1] * np.sin(theta))
+        cos.append(np.cos(theta))
 
-    wls = np.atleast_1d(wavelengths)
-    thetas = np.atleast_1d(theta)
+    E, forward, backward = [], [], []
+    for i in range(layers - 1):
+        d = d_list[i] if i < len(d_list) else None
+        E.append(
+            _interface_matrix(n[i], n[i + 1], cos[i], cos[i + 1], k0, d, polarizations)
+        )
+        if indices:
+            beta = k0 * n[i + 1] * cos[i + 1] * (d or 0)
+            forward.append(np.exp(-1j * beta))
+            backward.append(np.exp(1j * beta))
 
-    for wl, theta0 in np.broadcast(wls, thetas):
-        M = transfer_matrix(
-            material_list, d_list, float(wl), polarization, float(theta0)
+    # Präfixe F[i] = E_0 ... E_(i-1), Suffixspalten S[i] = E_i ... E_(L-2) · (1, 0)
+    identity = np.zeros_like(E[0])
+    identity[..., 0, 0] = identity[..., 1, 1] = 1
+    F = [identity]
+    for Ei in E:
+        F.append(_matmul(F[-1], Ei))
+    S = [None] * layers
+    S[-1] = np.zeros(E[0].shape[:-1], dtype=complex)
+    S[-1][..., 0] = 1
+    for i in range(layers - 2, -1, -1):
+        S[i] = _matvec(E[i], S[i + 1])
+    M00, M10 = F[-1][..., 0, 0], F[-1][..., 1, 0]
+    if quantity == "R":
+        amplitude, scale = M10 / M00, 1
+    else:
+        scale = np.stack(
+            [_admittance((n[0], cos[0]), (n[-1], cos[-1]), p) for p in polarizations]
         )
-        r = M[1, 0] / M[0, 0]
-        R.append(np.abs(r) ** 2)
-    return np.array(R)
+        amplitude = 1 / M00
+
+    def derivative(dM_column):
+        # Ableitung von |r|² bzw. |t|² aus der Ableitung der ersten Spalte von M
+        if quantity == "R":
+            da = (dM_column[..., 1] * M00 - M10 * dM_column[..., 0]) / M00**2
+        else:
+            da = -dM_column[..., 0] / M00**2
+        return 2 * scale * np.conj(amplitude) * da
+
+    def column(prefix, dE, suffix):
+        return _matvec(prefix, _matvec(dE, suffix))
+
+    def coefficient_derivatives(i):
+        # a, b und deren Ableitungen nach n1 (= n_i) und n2 (= n_(i+1)) pro Polarisation
+        n1, n2, c1, c2 = n[i], n[i + 1], cos[i], cos[i + 1]
+        one, zero = np.ones_like(c1 * n1), np.zeros_like(c1 * n1)
+        values = []
+        for p in polarizations:
+            if p == "Senkrecht":
+                q1, q2 = n1 * c1, n2 * c2
+                values.append(
+                    (one, q2 / q1, zero, -q2 / (q1**2 * c1), zero, 1 / (c2 * q1))
+                )
+            else:
+                dc1 = (1 - c1**2) / (n1 * c1)
+                dc2 = (1 - c2**2) / (n2 * c2)
+                values.append(
+                    (
+                        n2 / n1,
+                        c2 / c1,
+                        -n2 / n1**2,
+                        -c2 * dc1 / c1**2,
+                        one / n1,
+                        dc2 / c1,
+                    )
+                )
+        shape = np.broadcast(n1, n2, c1, c2).shape
+        return [np.stack([np.broadcast_to(x, shape) for x in v]) for v in zip(*values)]
+
+    d_dd, d_dn = [], []
+    for j in range(1, layers - 1):
+        # Schicht j steckt in E_(j-1) (Grenzfläche davor samt Propagation) und E_j;
+        # die Dicke wirkt nur über P: dE_(j-1)/dd = E_(j-1) · diag(-iκ, iκ)
+        i = j - 1
+        kappa = k0 * n[j] * cos[j]
+        scaled = S[j] * np.stack([-1j * kappa, 1j * kappa], axis=-1)
+        d_dd.append(derivative(_matvec(F[j], scaled)) * 1e-9)
+        if not indices:
+            continue
+
+        a, b, _, _, da2, db2 = coefficient_derivatives(i)
+        dbeta = k0 * d_list[i] / cos[j]
+        dE_in = _derivative_matrix(
+            da2, db2, forward[i], backward[i]
+        ) + _derivative_matrix(a, b, -1j * dbeta * forward[i], 1j * dbeta * backward[i])
+        _, _, da1, db1, _, _ = coefficient_derivatives(j)
+        dE_out = _derivative_matrix(da1, db1, forward[j], backward[j])
+        d_dn.append(
+            derivative(column(F[i], dE_in, S[j]) + column(F[j], dE_out, S[j + 1]))
+        )
+
+    value = np.sum(weights * scale * np.abs(amplitude) ** 2, axis=0)
+    d_dd = np.array([np.sum(weights * g.real, axis=0) for g in d_dd])
+    if not indices:
+        return value, d_dd, None, None
+    # d/dk = Re(i · d/dn), da r und t holomorph vom komplexen Brechungsindex abhängen
+    d_dk = np.array([np.sum(weights * (1j * g).real, axis=0) for g in d_dn])
+    d_dn = np.array([np.sum(weights * g.real, axis=0) for g in d_dn])
+    return value, d_dd, d_dn, d_dk
+
+
+def _executor(pool, workers):
+    """Erzeugt den Pool für parallele Berechnungen.
+
+    Args:
+        pool (str | Executor): "process", "thread" oder ein bestehender Executor.
+        workers (int): Anzahl der Worker, None für alle CPU-Kerne.
+
+    Returns:
+        Tupel aus Executor und der Angabe, ob er nach Gebrauch beendet werden muss.
+    """
+    if isinstance(pool, Executor):
+        return pool, False
+    if pool == "process":
+        return ProcessPoolExecutor(max_workers=workers), True
+    if pool == "thread":
+        return ThreadPoolExecutor(max_workers=workers), True
+    raise ValueError("pool muss 'process', 'thread' oder ein Executor sein.")
+
+
+def _reflectance_task(args):
+    """Berechnet eine Teilaufgabe im Worker; Argumente als Tupel, damit map sie pickeln kann."""
+    return reflectance(*args)
+
+
+def reflectance_parallel(
+    material_list,
+    wavelengths,
+    polarization,
+    theta,
+    workers: int = None,
+    chunks: int = None,
+    pool="process",
+    precision="double",
+):
+    """Berechnet reflectance parallel, indem das Raster in Blöcke aufgeteilt wird.
+
+    Wellenlängen und Winkel werden wie bei reflectance gebroadcastet, in zusammenhängende
+    Blöcke zerlegt und auf einen Prozess- oder Thread-Pool verteilt. Die Teilergebnisse
+    werden in ursprünglicher Reihenfolge zusammengesetzt.
+
+    Args:
+        material_list (list): Liste von Material-Objekten.
+        wavelengths (list | float): Wellenlängen in Meter.
+        polarization (str | float): Polarisation wie bei reflectance.
+        theta (list | float): Einfallswinkel in Radiant.
+        workers (int): Anzahl der Worker, None für alle CPU-Kerne.
+        chunks (int): Anzahl der Blöcke, standardmäßig vier pro Worker.
+        pool (str | Executor): "process", "thread" oder ein bestehender Executor.
+        precision (str): "double" oder "single"; die Kontrolle gegen "double" läuft
+            pro Block im jeweiligen Worker.
+
+    Returns:
+        Reflexionsgrade wie bei reflectance.
+    """
+    wls, thetas = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(wavelengths, dtype=float)),
+        np.atleast_1d(np.asarray(theta, dtype=float)),
+    )
+    wls, thetas = wls.ravel(), thetas.ravel()
+    if chunks is None:
+        chunks = 4 * (workers or os.cpu_count() or 1)
+    chunks = max(1, min(chunks, wls.size))
+    tasks = [
+        (material_list, wl_chunk, polarization, theta_chunk, precision)
+        for wl_chunk, theta_chunk in zip(
+            np.array_split(wls, chunks), np.array_split(thetas, chunks)
+        )
+    ]
+    executor, owned = _executor(pool, workers)
+    try:
+        return np.concatenate(list(executor.map(_reflectance_task, tasks)))
+    finally:
+        if owned:
+            executor.shutdown()
+
+
+def reflectance_batch(
+    stacks,
+    wavelengths,
+    polarization,
+    theta,
+    workers: int = None,
+    pool="process",
+    precision="double",
+):
+    """Berechnet die Reflexionsgrade vieler Schichtsysteme parallel auf demselben Raster.
+
+    Args:
+        stacks (list): Liste von Material-Listen, jeweils ein Schichtsystem.
+        wavelengths (list | float): Wellenlängen in Meter.
+        polarization (str | float): Polarisation wie bei reflectance.
+        theta (list | float): Einfallswinkel in Radiant.
+        workers (int): Anzahl der Worker, None für alle CPU-Kerne.
+        pool (str | Executor): "process", "thread" oder ein bestehender Executor.
+        precision (str): "double" oder "single", siehe reflectance.
+
+    Returns:
+        Array der Form (Anzahl Schichtsysteme, N) in der Reihenfolge von stacks.
+    """
+    tasks = [(stack, wavelengths, polarization, theta, precision) for stack in stacks]
+    executor, owned = _executor(pool, workers)
+    try:
+        return np.array(list(executor.map(_reflectance_task, tasks)))
+    finally:
+        if owned:
+            executor.shutdown()
+
+
+def perturbed_reflectance(
+    material_list, wavelengths, polarization, theta, thickness_errors, index_errors
+):
+    """Berechnet R für viele gestörte Varianten eines Schichtsystems in einem Durchlauf.
+
+    Die Varianten bilden eine zusätzliche Batch-Achse: Varianten und Rasterpunkte
+    werden zu einem gemeinsamen flachen Raster zusammengelegt, sodass weiterhin nur
+    über die Schichten iteriert wird. Einfallsmedium und Substrat bleiben ungestört.
+
+    Args:
+        material_list (list): Liste von Material-Objekten.
+        wavelengths (list | float): Wellenlängen in Meter.
+        polarization (str | float): Polarisation wie bei reflectance.
+        theta (list | float): Einfallswinkel in Radiant.
+        thickness_errors (np.ndarray): Relative Dickenfehler der Form
+            (Varianten, Innenschichten), 0.01 entspricht +1 %.
+        index_errors (np.ndarray): Additive Fehler des Realteils der Brechungsindizes
+            der Form (Varianten, Innenschichten).
+
+    Returns:
+        Array der Form (Varianten, N).
+    """
+    thickness_errors, index_errors = np.broadcast_arrays(
+        np.atleast_2d(thickness_errors), np.atleast_2d(index_errors)
+    )
+    shape = (thickness_errors.shape[0], len(material_list) - 2)
+    thickness_errors = np.broadcast_to(thickness_errors, shape)
+    index_errors = np.broadcast_to(index_errors, shape)
+    if polarization in POLARIZATIONS:
+        polarizations = (polarization,)
+    else:
+        polarizations = POLARIZATIONS
+        s_share = polarization_share(polarization)
+    _require_coherent(material_list)
+    wls, theta, k0, indices = _prepare_grid(material_list, wavelengths, theta)
+    samples, size = thickness_errors.shape[0], wls.size
+    k0, theta = np.tile(k0, samples), np.tile(theta, samples)
+    d_list = [m.d * 1e-9 for m in material_list[1:-1]]
+
+    # Ungestörte Indizes von Einfallsmedium und Substrat auf alle Varianten verteilen
+    n1 = np.tile(indices[0], samples) if np.ndim(indices[0]) else indices[0]
+    cos1 = np.cos(theta)
+    incident = (n1, cos1)
+    M = None
+    for i in range(len(material_list) - 1):
+        n2 = indices[i + 1]
+        d = None
+        if i < len(d_list):
+            n2 = (np.broadcast_to(n2, (size,)) + index_errors[:, i, np.newaxis]).ravel()
+            d = np.repeat(np.maximum(d_list[i] * (1 + thickness_errors[:, i]), 0), size)
+        elif np.ndim(n2):
+            n2 = np.tile(n2, samples)
+        theta = np.arcsin(n1 / n2 * np.sin(theta))
+        cos2 = np.cos(theta)
+        D = _interface_matrix(n1, n2, cos1, cos2, k0, d, polarizations)
+        M = D if M is None else _matmul(M, D)
+        n1, cos1 = n2, cos2
+    results = _results_from_matrices(M, polarizations, incident, (n1, cos1))
+    if len(results) == 1:
+        R = results[0].R
+    else:
+        R = OpticalResult.mix(*results, s_share).R
+    return R.reshape(samples, size)
+
+
+material_library = MaterialLibrary(
+    os.environ.get(
+        "MATERIAL_LIBRARY",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "Material.json"),
+    )
+)
 
 
-material_list = Material.toMaterial()
+def __getattr__(name):
+    """Stellt material_list für ältere Skripte bereit, ohne die Bibliothek beim Import zu laden."""
+    if name == "material_list":
+        return list(material_library)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
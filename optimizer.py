@@ -0,0 +1,299 @@
+import copy
+from concurrent.futures import as_completed
+
+import numpy as np
+
+from main import _executor, optical_gradient
+
+
+# /////////////////////////
+#   Optimierung der Schichtdicken auf ein Zielspektrum
+#
+#   Bewertet wird die gewichtete mittlere quadratische Abweichung
+#       F = mean(w · ((X(λ) - Ziel(λ)) / Toleranz)²),   X = R oder T
+#   Die lokale Verfeinerung ist ein Levenberg-Marquardt-Verfahren auf den
+#   analytischen Ableitungen aus optical_gradient, die globale Suche startet
+#   es parallel von zufällig gestörten Ausgangsdicken.
+# ////////////////////////
+class OptimizationResult:
+    """Ergebnis einer Dickenoptimierung.
+
+    Attributes:
+        thicknesses (np.ndarray): Dicken aller Innenschichten in nm.
+        merit (float): Erreichter Wert der Gütefunktion.
+        iterations (int): Anzahl der Iterationen der lokalen Verfeinerung.
+        converged (bool): Ob ein Abbruchkriterium statt der Iterationsgrenze erreicht wurde.
+    """
+
+    def __init__(self, thicknesses, merit, iterations=0, converged=False):
+        self.thicknesses = np.asarray(thicknesses, dtype=float)
+        self.merit = float(merit)
+        self.iterations = iterations
+        self.converged = converged
+
+    def apply(self, material_list):
+        """Überträgt die optimierten Dicken auf eine Kopie des Schichtsystems.
+
+        Args:
+            material_list (list): Ausgangs-Schichtsystem.
+
+        Returns:
+            Neue Liste von Material-Objekten.
+        """
+        return with_thicknesses(material_list, self.thicknesses)
+
+    def __str__(self):
+        return (
+            f"Gütefunktion: {self.merit:.4g} nach {self.iterations} Iterationen, "
+            f"Dicken: {np.round(self.thicknesses, 2).tolist()}"
+        )
+
+
+def with_thicknesses(material_list, thicknesses):
+    """Erzeugt eine Kopie des Schichtsystems mit neuen Dicken der Innenschichten.
+
+    Args:
+        material_list (list): Liste von Material-Objekten.
+        thicknesses (list): Dicken der Innenschichten in nm.
+
+    Returns:
+        Neue Liste von Material-Objekten.
+    """
+    stack = [copy.copy(m) for m in material_list]
+    for m, d in zip(stack[1:-1], thicknesses):
+        m.d = float(d)
+    return stack
+
+
+def _residual_weights(target, weights, tolerances, size):
+    """Fasst Gewichte und Toleranzen zu einem Faktor pro Rasterpunkt zusammen."""
+    target = np.broadcast_to(np.asarray(target, dtype=float), (size,))
+    tolerances = np.broadcast_to(np.asarray(tolerances, dtype=float), (size,))
+    if np.any(tolerances <= 0):
+        raise ValueError("Toleranzen müssen größer als 0 sein.")
+    weights = np.broadcast_to(np.asarray(weights, dtype=float), (size,))
+    if np.any(weights < 0):
+        raise ValueError("Gewichte dürfen nicht negativ sein.")
+    return target, np.sqrt(weights / size) / tolerances
+
+
+def merit_function(
+    material_list,
+    wavelengths,
+    target,
+    quantity="R",
+    polarization="Senkrecht",
+    theta=0,
+    weights=1.0,
+    tolerances=1.0,
+):
+    """Bewertet ein Schichtsystem gegenüber dem Zielspektrum.
+
+    Args:
+        material_list (list): Liste von Material-Objekten.
+        wavelengths (np.ndarray): Wellenlängen in Meter.
+        target (float | np.ndarray): Zielwerte von R bzw. T pro Wellenlänge.
+        quantity (str): "R" oder "T".
+        polarization (str | float): Polarisation wie bei reflectance.
+        theta (float): Einfallswinkel in Radiant.
+        weights (float | np.ndarray): Gewichte pro Wellenlänge.
+        tolerances (float | np.ndarray): Erlaubte Abweichung pro Wellenlänge.
+
+    Returns:
+        Wert der Gütefunktion, 0 bei exakter Übereinstimmung.
+    """
+    wavelengths = np.atleast_1d(np.asarray(wavelengths, dtype=float))
+    target, scale = _residual_weights(target, weights, tolerances, wavelengths.size)
+    value, _, _, _ = optical_gradient(
+        material_list, wavelengths, polarization, theta, quantity, indices=False
+    )
+    return float(np.sum((scale * (value - target)) ** 2))
+
+
+def refine(
+    material_list,
+    wavelengths,
+    target,
+    quantity="R",
+    polarization="Senkrecht",
+    theta=0,
+    weights=1.0,
+    tolerances=1.0,
+    layers=None,
+    min_thickness=0.0,
+    max_step=None,
+    max_iterations=200,
+    progress=None,
+    stop=None,
+):
+    """Verfeinert die Schichtdicken lokal mit dem Levenberg-Marquardt-Verfahren.
+
+    Pro Iteration wird das Spektrum samt Jacobi-Matrix einmal analytisch berechnet.
+    Die Schrittweite ist begrenzt, damit keine Schicht in eine andere Interferenzordnung
+    springt, und keine Schicht wird dünner als die Mindestdicke.
+
+    Args:
+        material_list (list): Ausgangs-Schichtsystem mit umgebendem Medium und Substrat.
+        wavelengths (np.ndarray): Wellenlängen in Meter.
+        target (float | np.ndarray): Zielwerte von R bzw. T pro Wellenlänge.
+        quantity (str): "R" oder "T".
+        polarization (str | float): Polarisation wie bei reflectance.
+        theta (float): Einfallswinkel in Radiant.
+        weights (float | np.ndarray): Gewichte pro Wellenlänge.
+        tolerances (float | np.ndarray): Erlaubte Abweichung pro Wellenlänge.
+        layers (list): Indizes der freigegebenen Innenschichten (1 = erste Schicht),
+            standardmäßig alle.
+        min_thickness (float): Mindestdicke in nm.
+        max_step (float): Größte Dickenänderung pro Iteration in nm, standardmäßig
+            ein Achtel der kleinsten Wellenlänge.
+        max_iterations (int): Maximale Anzahl an Iterationen.
+        progress (callable): Wird nach jeder Iteration mit (Iteration, Gütefunktion)
+            aufgerufen.
+        stop (callable): Liefert True, wenn die Optimierung abgebrochen werden soll.
+
+    Returns:
+        OptimizationResult mit dem besten gefundenen Schichtsystem.
+
+    Raises:
+        ValueError: Bei fehlenden Innenschichten oder ungültigen Toleranzen.
+    """
+    wavelengths = np.atleast_1d(np.asarray(wavelengths, dtype=float))
+    if len(material_list) < 3:
+        raise ValueError("Das Schichtsystem enthält keine Innenschichten.")
+    target, scale = _residual_weights(target, weights, tolerances, wavelengths.size)
+    free = (
+        np.arange(len(material_list) - 2)
+        if layers is None
+        else np.asarray(layers, dtype=int) - 1
+    )
+    thicknesses = np.array([m.d for m in material_list[1:-1]], dtype=float)
+    if max_step is None:
+        max_step = wavelengths.min() * 1e9 / 8
+
+    def evaluate(d):
+        value, d_dd, _, _ = optical_gradient(
+            with_thicknesses(material_list, d),
+            wavelengths,
+            polarization,
+            theta,
+            quantity,
+            indices=False,
+        )
+        residual = scale * (value - target)
+        return residual, scale * d_dd[free], float(residual @ residual)
+
+    residual, jacobian, merit = evaluate(thicknesses)
+    damping = 1e-3
+    iteration, converged = 0, False
+    while iteration < max_iterations and not converged:
+        if stop is not None and stop():
+            break
+        iteration += 1
+        gradient = jacobian @ residual
+        hessian = jacobian @ jacobian.T
+        diagonal = np.diag(hessian) + 1e-12
+        while True:
+            step = np.linalg.solve(hessian + damping * np.diag(diagonal), -gradient)
+            step *= min(1, max_step / max(np.max(np.abs(step)), 1e-300))
+            trial = thicknesses.copy()
+            trial[free] = np.maximum(trial[free] + step, min_thickness)
+            trial_residual, trial_jacobian, trial_merit = evaluate(trial)
+            if trial_merit < merit:
+                improvement = merit - trial_merit
+                moved = np.max(np.abs(trial - thicknesses))
+                thicknesses, residual, jacobian = trial, trial_residual, trial_jacobian
+                merit = trial_merit
+                damping = max(damping / 3, 1e-9)
+                converged = improvement <= 1e-10 * max(merit, 1e-12) or moved < 1e-6
+                break
+            damping *= 4
+            if damping > 1e8:
+                converged = True
+                break
+        if progress is not None:
+            progress(iteration, merit)
+    return OptimizationResult(thicknesses, merit, iteration, converged)
+
+
+def _refine_task(args):
+    """Führt refine für einen Startpunkt aus (Hilfsfunktion für Prozess-Pools)."""
+    material_list, thicknesses, options = args
+    return refine(with_thicknesses(material_list, thicknesses), **options)
+
+
+def global_search(
+    material_list,
+    wavelengths,
+    target,
+    starts=8,
+    spread=0.5,
+    seed=None,
+    workers=None,
+    pool="process",
+    progress=None,
+    stop=None,
+    **options,
+):
+    """Sucht das globale Optimum durch parallele lokale Verfeinerung vieler Startpunkte.
+
+    Der erste Start verwendet die aktuellen Dicken, alle weiteren streuen jede freie
+    Schicht gleichverteilt um ±spread relativ zur Ausgangsdicke.
+
+    Args:
+        material_list (list): Ausgangs-Schichtsystem.
+        wavelengths (np.ndarray): Wellenlängen in Meter.
+        target (float | np.ndarray): Zielwerte von R bzw. T pro Wellenlänge.
+        starts (int): Anzahl der Startpunkte.
+        spread (float): Relative Streuung der Startdicken.
+        seed (int): Startwert des Zufallsgenerators.
+        workers (int): Anzahl der Worker, None für alle CPU-Kerne.
+        pool (str | Executor): "process", "thread" oder ein bestehender Executor.
+        progress (callable): Wird nach jedem fertigen Start mit
+            (Anzahl fertiger Starts, beste Gütefunktion) aufgerufen.
+        stop (callable): Liefert True, wenn keine weiteren Ergebnisse abgewartet werden
+            sollen; bei pool="thread" brechen auch laufende Verfeinerungen ab.
+        **options: Weitere Argumente für refine (quantity, polarization, theta,
+            weights, tolerances, layers, min_thickness, max_iterations).
+
+    Returns:
+        OptimizationResult des besten Startpunkts.
+    """
+    options = dict(options, wavelengths=wavelengths, target=target)
+    rng = np.random.default_rng(seed)
+    initial = np.array([m.d for m in material_list[1:-1]], dtype=float)
+    free = (
+        np.arange(initial.size)
+        if options.get("layers") is None
+        else np.asarray(options["layers"], dtype=int) - 1
+    )
+    min_thickness = options.get("min_thickness", 0.0)
+    start_points = [initial]
+    for _ in range(starts - 1):
+        d = initial.copy()
+        d[free] *= 1 + spread * rng.uniform(-1, 1, free.size)
+        start_points.append(np.maximum(d, min_thickness))
+
+    if pool == "thread":
+        # Threads teilen sich den Prozess, laufende Verfeinerungen können mit abbrechen
+        options["stop"] = stop
+    executor, owned = _executor(pool, workers)
+    best = None
+    try:
+        futures = [
+            executor.submit(_refine_task, (material_list, d, options))
+            for d in start_points
+        ]
+        for done, future in enumerate(as_completed(futures), start=1):
+            result = future.result()
+            if best is None or result.merit < best.merit:
+                best = result
+            if progress is not None:
+                progress(done, best.merit)
+            if stop is not None and stop():
+                for f in futures:
+                    f.cancel()
+                break
+    finally:
+        if owned:
+            executor.shutdown(wait=False, cancel_futures=True)
+    return best
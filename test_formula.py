@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from main import Material
+
+# /////////////////////////
+#   Prüfung benutzerdefinierter Formeln (n_type 2)
+#
+#   python -m pytest test_formula.py
+# ////////////////////////
+BYPASS = (
+    "x*0 + 1.5 + 0*[[s for s in c.__class__.__base__.__subclasses__() "
+    "if s.__name__ == 'catch_warnings'][0]()._module.__builtins__['__import__']"
+    "('os').getpid() for c in [1]][0]"
+)
+
+
+@pytest.mark.parametrize(
+    "formula",
+    [
+        BYPASS,
+        "1.5 + 0*[c for c in [1]][0]",
+        "1.5 + 0*{c for c in [1]}.pop()",
+        "1.5 + 0*{c: c for c in [1]}[1]",
+        "1.5 + 0*sqrt(sum(c for c in [1]))",
+        "(lambda: 1.5)()",
+        "1.5 + 0*(lambda c: c)(1)",
+        "1.5 + x.__class__.__name__",
+        "sqrt(x, out=x)",
+        "'1.5'",
+    ],
+)
+def test_rejects_unsafe_formulas(formula):
+    with pytest.raises(SyntaxError):
+        Material("Formel", 2, formula=formula)
+
+
+def test_rejects_unknown_names():
+    with pytest.raises(NameError):
+        Material("Formel", 2, formula="1.5 + 0*__import__(x)")
+
+
+def test_accepts_numpy_functions():
+    m = Material(
+        "Formel",
+        2,
+        formula="where(x > 0.5, 1.5, 1.4) + 0.01*arcsinh(x) + 0*pi + x[0]*0",
+    )
+    n = m.refractive_index(np.array([4e-7, 6e-7]))
+    np.testing.assert_allclose(
+        n, np.where([0.4 > 0.5, 0.6 > 0.5], 1.5, 1.4) + 0.01 * np.arcsinh([0.4, 0.6])
+    )
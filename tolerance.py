@@ -0,0 +1,160 @@
+import numpy as np
+
+from main import _executor, perturbed_reflectance
+
+# /////////////////////////
+#   Toleranzanalyse (Monte-Carlo)
+#
+#   Pro Stichprobe wird jede Innenschicht mit einem zufälligen relativen
+#   Dickenfehler und einem additiven Fehler des Brechungsindex gestört. Alle
+#   Stichproben werden als zusätzliche Batch-Achse in wenigen Blöcken berechnet
+#   (perturbed_reflectance) und zu Mittelwert und Perzentil-Hüllkurven verdichtet.
+# ////////////////////////
+DISTRIBUTIONS = ("normal", "uniform")
+POINTS_PER_BLOCK = 2**14
+
+
+class ToleranceResult:
+    """Statistik der Reflexionsgrade aller Stichproben einer Toleranzanalyse.
+
+    Attributes:
+        nominal (np.ndarray): Reflexionsgrad des ungestörten Schichtsystems.
+        mean (np.ndarray): Mittelwert über alle Stichproben.
+        std (np.ndarray): Standardabweichung über alle Stichproben.
+        percentiles (dict): Perzentil in Prozent zu Reflexionsgraden.
+        samples (int): Anzahl der Stichproben.
+    """
+
+    def __init__(self, nominal, R, percentiles=(5, 50, 95)):
+        self.nominal = nominal
+        self.mean = R.mean(axis=0)
+        self.std = R.std(axis=0)
+        self.percentiles = dict(zip(percentiles, np.percentile(R, percentiles, axis=0)))
+        self.samples = R.shape[0]
+
+    def envelope(self):
+        """Liefert das kleinste und größte berechnete Perzentil als Hüllkurve."""
+        return (
+            self.percentiles[min(self.percentiles)],
+            self.percentiles[max(self.percentiles)],
+        )
+
+
+def sample_errors(
+    material_list,
+    samples: int,
+    thickness_error=0.0,
+    index_error=0.0,
+    distribution: str = "normal",
+    seed=None,
+):
+    """Zieht zufällige Fertigungsfehler für alle Innenschichten.
+
+    Args:
+        material_list (list): Liste von Material-Objekten.
+        samples (int): Anzahl der Stichproben.
+        thickness_error (float | list): Relativer Dickenfehler, einzeln oder pro
+            Innenschicht; bei "normal" die Standardabweichung, bei "uniform" die
+            halbe Breite (0.01 entspricht 1 %).
+        index_error (float | list): Fehler des Realteils des Brechungsindex,
+            einzeln oder pro Innenschicht, Bedeutung wie thickness_error.
+        distribution (str): "normal" oder "uniform".
+        seed (int): Startwert des Zufallsgenerators.
+
+    Returns:
+        Tupel aus Dicken- und Indexfehlern, jeweils der Form (samples, Innenschichten).
+
+    Raises:
+        ValueError: Bei unbekannter Verteilung oder negativen Fehlern.
+    """
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError("Verteilung muss 'normal' oder 'uniform' sein.")
+    layers = len(material_list) - 2
+    widths = np.stack(
+        [
+            np.broadcast_to(np.asarray(thickness_error, dtype=float), (layers,)),
+            np.broadcast_to(np.asarray(index_error, dtype=float), (layers,)),
+        ]
+    )
+    if np.any(widths < 0):
+        raise ValueError("Fehler dürfen nicht negativ sein.")
+    rng = np.random.default_rng(seed)
+    if distribution == "normal":
+        draws = rng.standard_normal((2, samples, layers))
+    else:
+        draws = rng.uniform(-1, 1, (2, samples, layers))
+    thickness_errors, index_errors = draws * widths[:, np.newaxis, :]
+    return thickness_errors, index_errors
+
+
+def _block_task(args):
+    """Berechnet einen Block von Stichproben (Hilfsfunktion für Pools)."""
+    return perturbed_reflectance(*args)
+
+
+def tolerance_analysis(
+    material_list,
+    wavelengths,
+    polarization,
+    theta,
+    thickness_error=0.0,
+    index_error=0.0,
+    samples: int = 1000,
+    distribution: str = "normal",
+    percentiles=(5, 50, 95),
+    seed=None,
+    workers: int = None,
+    pool=None,
+):
+    """Monte-Carlo-Analyse der Reflexion unter zufälligen Dicken- und Indexfehlern.
+
+    Die Stichproben werden in Blöcken von höchstens POINTS_PER_BLOCK Rasterpunkten
+    vektorisiert berechnet; mit pool werden die Blöcke parallel verteilt.
+
+    Args:
+        material_list (list): Liste von Material-Objekten.
+        wavelengths (list | float): Wellenlängen in Meter.
+        polarization (str | float): Polarisation wie bei reflectance.
+        theta (list | float): Einfallswinkel in Radiant.
+        thickness_error (float | list): Relativer Dickenfehler, siehe sample_errors.
+        index_error (float | list): Fehler des Brechungsindex, siehe sample_errors.
+        samples (int): Anzahl der Stichproben.
+        distribution (str): "normal" oder "uniform".
+        percentiles (tuple): Zu berechnende Perzentile in Prozent.
+        seed (int): Startwert des Zufallsgenerators.
+        workers (int): Anzahl der Worker, None für alle CPU-Kerne.
+        pool (str | Executor): None für eine sequenzielle Berechnung, sonst
+            "process", "thread" oder ein bestehender Executor.
+
+    Returns:
+        ToleranceResult mit nominaler Kurve, Mittelwert und Perzentilen.
+    """
+    thickness_errors, index_errors = sample_errors(
+        material_list, samples, thickness_error, index_error, distribution, seed
+    )
+    size = np.broadcast(np.asarray(wavelengths), np.asarray(theta)).size
+    block = max(1, POINTS_PER_BLOCK // size)
+    tasks = [
+        (
+            material_list,
+            wavelengths,
+            polarization,
+            theta,
+            thickness_errors[i : i + block],
+            index_errors[i : i + block],
+        )
+        for i in range(0, samples, block)
+    ]
+    if pool is None:
+        R = np.concatenate([_block_task(task) for task in tasks])
+    else:
+        executor, owned = _executor(pool, workers)
+        try:
+            R = np.concatenate(list(executor.map(_block_task, tasks)))
+        finally:
+            if owned:
+                executor.shutdown()
+    nominal = perturbed_reflectance(
+        material_list, wavelengths, polarization, theta, 0.0, 0.0
+    )[0]
+    return ToleranceResult(nominal, R, percentiles)